@@ -0,0 +1,170 @@
+"""
+GPS Pipeline Scaling Benchmark
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from pathlib import Path
+from datetime import datetime
+import json
+import platform
+import shutil
+from task1 import (EXCEL_MAX_ROWS, add_metrics, calculate_trip_summary, output_table,
+                   parse_gsd_arrays, point_table)
+from task2 import FIGURE_DPI, FIGURES, load_gps_data
+from synthetic_data import TRIPS_PER_USER, generate_gsd_files
+from instrumentation import finish_run, save_run_report, stage, start_run
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+BENCHMARK_FOLDER = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\benchmark"
+
+# Multiples of the synthetic base data set (synthetic_data defaults, ~16k points)
+SCALES = [1, 10, 100, 1000]
+# Time the Excel export too (skipped above the Excel row limit)
+BENCHMARK_XLSX = True
+# Keep the generated .gsd files and outputs of each scale
+KEEP_DATA = False
+
+# ============================================================================
+
+REPORT_PATTERN = 'benchmark_*.json'
+
+
+def measure(report, scale, name, points, func, *args, **kwargs):
+    # Runs func as one stage of the report and returns func's return value
+    with stage(report, name, points, scale=scale) as record:
+        value = func(*args, **kwargs)
+    
+    memory = f", peak RSS {record['peak_rss_mb']:.0f} MB" if record['peak_rss_mb'] is not None else ""
+    print(f"  {name:.<32} {record['seconds']:8.3f}s  {record['points_per_sec'] or 0:12,.0f} points/s{memory}")
+    return value
+
+
+def _parse_and_metrics(report, scale, gsd_files, points):
+    # Same per-file steps as Task 1 (process_gsd_file), timed stage by stage
+    def parse_all():
+        return {gsd_file.stem: parse_gsd_arrays(gsd_file) for gsd_file in gsd_files}
+    
+    def metrics_all(file_arrays):
+        return {user: add_metrics(arrays) for user, arrays in file_arrays.items() if arrays is not None}
+    
+    file_arrays = measure(report, scale, 'parse_gsd_arrays', points, parse_all)
+    return measure(report, scale, 'add_metrics', points, metrics_all, file_arrays)
+
+
+def _write_csv(points, csv_file):
+    output_table(points).to_csv(csv_file, index=False)
+
+
+def _write_xlsx(points, excel_file):
+    output_table(points).to_excel(excel_file, index=False)
+
+
+def run_scale(scale, scale_folder, report):
+    data_folder = Path(scale_folder) / 'data'
+    results_folder = Path(scale_folder) / 'results'
+    results_folder.mkdir(exist_ok=True, parents=True)
+    
+    print(f"Scale {scale}x:")
+    gsd_files, points = generate_gsd_files(data_folder, trips=scale * TRIPS_PER_USER)
+    print(f"  {points} GPS points in {len(gsd_files)} files")
+    
+    file_arrays = _parse_and_metrics(report, scale, gsd_files, points)
+    combined_df = measure(report, scale, 'combine', points, point_table, file_arrays)
+    del file_arrays
+    
+    measure(report, scale, 'calculate_trip_summary', points, calculate_trip_summary, combined_df)
+    
+    csv_file = results_folder / 'gps_processed_data.csv'
+    # The DATE/TIME strings are formatted as part of the write, as in Task 1
+    measure(report, scale, 'write_csv', points, _write_csv, combined_df, csv_file)
+    if BENCHMARK_XLSX and points <= EXCEL_MAX_ROWS:
+        measure(report, scale, 'write_xlsx', points, _write_xlsx, combined_df,
+                results_folder / 'gps_processed_data.xlsx')
+    del combined_df
+    
+    df = measure(report, scale, 'load_gps_data', points, load_gps_data, csv_file)
+    fig_folder = results_folder / 'figures'
+    fig_folder.mkdir(exist_ok=True)
+    for plot, _, columns in FIGURES:
+        measure(report, scale, plot.__name__, points, plot, df[columns], fig_folder, dpi=FIGURE_DPI)
+    del df
+    
+    if not KEEP_DATA:
+        shutil.rmtree(scale_folder)
+    print()
+
+
+def run_benchmark(benchmark_folder, scales=SCALES):
+    # Runs every scale and writes benchmark_<timestamp>.json; returns the report
+    plt.switch_backend('Agg')
+    benchmark_path = Path(benchmark_folder)
+    benchmark_path.mkdir(exist_ok=True, parents=True)
+    
+    report = start_run('benchmark')
+    report['environment'].update({
+        'processor': platform.processor(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'figure_dpi': FIGURE_DPI
+    })
+    report['scales'] = list(scales)
+    for scale in scales:
+        run_scale(scale, benchmark_path / f'scale_{scale}x', report)
+    finish_run(report)
+    
+    report_file = benchmark_path / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    save_run_report(report, report_file)
+    print(f"✓ Saved benchmark report to: {report_file}")
+    return report
+
+
+def load_report(report_file):
+    with open(report_file) as f:
+        return json.load(f)
+
+
+def compare_reports(previous, current):
+    # Speed-up of every (scale, stage) timed in both reports (>1 means faster now)
+    before = {(r['scale'], r['stage']): r['seconds'] for r in previous['stages']}
+    rows = []
+    for r in current['stages']:
+        old = before.get((r['scale'], r['stage']))
+        if old is not None and r['seconds'] > 0:
+            rows.append({'scale': r['scale'], 'stage': r['stage'], 'before_sec': old,
+                         'after_sec': r['seconds'], 'speedup': round(old / r['seconds'], 2)})
+    return pd.DataFrame(rows, columns=['scale', 'stage', 'before_sec', 'after_sec', 'speedup'])
+
+
+def main():
+    print("="*80)
+    print("GPS PIPELINE SCALING BENCHMARK")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  OUTPUT:     {BENCHMARK_FOLDER}")
+    print(f"  Scales: {', '.join(f'{s}x' for s in SCALES)}")
+    print()
+    
+    previous_reports = sorted(Path(BENCHMARK_FOLDER).glob(REPORT_PATTERN))
+    report = run_benchmark(BENCHMARK_FOLDER, SCALES)
+    
+    if previous_reports:
+        comparison = compare_reports(load_report(previous_reports[-1]), report)
+        print()
+        print("="*80)
+        print(f"COMPARED TO {previous_reports[-1].name}:")
+        print("="*80)
+        print(comparison.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
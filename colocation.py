@@ -0,0 +1,242 @@
+"""
+GPS Co-location Join
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import os
+from task1 import haversine_distance
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
+
+# Two users meet when they have fixes at most RADIUS_M meters and at most
+# WINDOW_SEC seconds apart
+RADIUS_M = 50
+WINDOW_SEC = 30
+# Meetings of the same two users at most this far apart form one episode
+EPISODE_GAP_SEC = 300
+
+# Length of the time partitions, joined in parallel by WORKERS processes
+PARTITION_SEC = 86400
+WORKERS = 1
+# Candidate point pairs compared at a time (bounds memory in crowded buckets)
+PAIR_BATCH = 4000000
+
+# ============================================================================
+
+ENCOUNTER_FILE_NAME = 'encounters.csv'
+KM_PER_DEGREE = 6371 * np.pi / 180
+
+# Buckets (time window, cell row, cell column) following a bucket; together
+# with the bucket itself they hold every pair of neighbouring buckets once
+_NEIGHBOURS = [(dt, dy, dx) for dt in (0, 1) for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+               if (dt, dy, dx) > (0, 0, 0)]
+
+
+def _bucket_keys(lat, lon, epoch, radius_m, window_sec):
+    # Buckets of window_sec seconds and cells at least radius_m wide, keyed
+    # so that a neighbouring bucket is a fixed key offset away
+    cell_lat = radius_m / 1000 / KM_PER_DEGREE
+    cell_lon = cell_lat / max(np.cos(np.radians(np.abs(lat).max())), 1e-6)
+    t = epoch // window_sec
+    y = np.floor(lat / cell_lat).astype(np.int64)
+    x = np.floor(lon / cell_lon).astype(np.int64)
+    t, y, x = t - t.min(), y - y.min() + 1, x - x.min() + 1
+    ny, nx = int(y.max()) + 2, int(x.max()) + 2
+    offsets = [(dt * ny + dy) * nx + dx for dt, dy, dx in _NEIGHBOURS]
+    return (t * ny + y) * nx + x, offsets
+
+
+def _bucket_pairs(buckets, offset):
+    # Positions (a, b) of non-empty buckets with buckets[b] == buckets[a] + offset
+    b = np.minimum(np.searchsorted(buckets, buckets + offset), len(buckets) - 1)
+    found = buckets[b] == buckets + offset
+    return np.flatnonzero(found), b[found]
+
+
+def _expand(a, b, starts, counts):
+    # Every (point of bucket a, point of bucket b) for the bucket pairs
+    sizes = counts[a] * counts[b]
+    pair = np.repeat(np.arange(len(a)), sizes)
+    local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return starts[a][pair] + local // counts[b][pair], starts[b][pair] + local % counts[b][pair]
+
+
+def colocation_matches(lat, lon, epoch, users, radius_m=RADIUS_M, window_sec=WINDOW_SEC,
+                       pair_batch=PAIR_BATCH):
+    # Row pairs (i, j) of different users at most radius_m meters and
+    # window_sec seconds apart, with their distance in meters. Only points of
+    # neighbouring buckets are compared, so the work grows with the number of
+    # points (times the points per bucket), not with its square.
+    if len(epoch) < 2:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([])
+    keys, offsets = _bucket_keys(lat, lon, epoch, radius_m, window_sec)
+    order = np.argsort(keys, kind='stable')
+    buckets, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    
+    bucket_pairs = [_bucket_pairs(buckets, offset) for offset in [0] + offsets]
+    a = np.concatenate([pairs[0] for pairs in bucket_pairs])
+    b = np.concatenate([pairs[1] for pairs in bucket_pairs])
+    sizes = counts[a] * counts[b]
+    batch = (np.cumsum(sizes) - sizes) // pair_batch
+    bounds = np.append(np.flatnonzero(np.diff(batch, prepend=-1)), len(batch))
+    
+    found_i, found_j, found_distance = [], [], []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        i, j = _expand(a[start:stop], b[start:stop], starts, counts)
+        # Within one bucket each pair appears twice and with itself
+        keep = (a[start:stop] != b[start:stop]).repeat(sizes[start:stop]) | (i < j)
+        i, j = order[i[keep]], order[j[keep]]
+        keep = (users[i] != users[j]) & (np.abs(epoch[i] - epoch[j]) <= window_sec)
+        i, j = i[keep], j[keep]
+        distance = haversine_distance(lat[i], lon[i], lat[j], lon[j]) * 1000
+        keep = distance <= radius_m
+        found_i.append(i[keep])
+        found_j.append(j[keep])
+        found_distance.append(distance[keep])
+    return np.concatenate(found_i), np.concatenate(found_j), np.concatenate(found_distance)
+
+
+def _partition_matches(lat, lon, epoch, users, end, radius_m, window_sec, pair_batch):
+    # The partition holds its own points and those of the following
+    # window_sec seconds; a match belongs to the partition of its earlier point
+    i, j, distance = colocation_matches(lat, lon, epoch, users, radius_m, window_sec, pair_batch)
+    keep = np.minimum(epoch[i], epoch[j]) < end
+    return i[keep], j[keep], distance[keep]
+
+
+def partitioned_matches(lat, lon, epoch, users, radius_m=RADIUS_M, window_sec=WINDOW_SEC,
+                        partition_sec=PARTITION_SEC, workers=WORKERS, pair_batch=PAIR_BATCH):
+    # colocation_matches over time partitions of partition_sec seconds, in
+    # workers processes; rows must be sorted by epoch
+    partitions = np.unique(epoch // partition_sec)
+    first = np.searchsorted(epoch, partitions * partition_sec)
+    ends = (partitions + 1) * partition_sec
+    stop = np.searchsorted(epoch, ends + window_sec, side='right')
+    args = [(lat[f:s], lon[f:s], epoch[f:s], users[f:s], end, radius_m, window_sec, pair_batch)
+            for f, s, end in zip(first, stop, ends)]
+    
+    if workers is None:
+        workers = os.cpu_count()
+    if workers <= 1 or len(args) <= 1:
+        results = [_partition_matches(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args))) as executor:
+            results = list(executor.map(_partition_matches, *zip(*args)))
+    
+    i = np.concatenate([np.array([], dtype=np.int64)] + [r[0] + f for r, f in zip(results, first)])
+    j = np.concatenate([np.array([], dtype=np.int64)] + [r[1] + f for r, f in zip(results, first)])
+    distance = np.concatenate([np.array([])] + [r[2] for r in results])
+    return i, j, distance
+
+
+def encounter_episodes(i, j, distance, epoch, users, episode_gap_sec=EPISODE_GAP_SEC):
+    # Joins the matches of each user pair that lie at most episode_gap_sec
+    # apart; returns per episode the rows (a, b) of the closest match, the
+    # start, end, minimum distance and number of matches
+    swap = users[i] > users[j]
+    a, b = np.where(swap, j, i), np.where(swap, i, j)
+    start, end = np.minimum(epoch[a], epoch[b]), np.maximum(epoch[a], epoch[b])
+    _, rank = np.unique(users[a] * (users.max(initial=0) + 1) + users[b], return_inverse=True)
+    
+    order = np.lexsort([start, rank])
+    a, b, start, end, distance, rank = (v[order] for v in (a, b, start, end, distance, rank))
+    # One time line with the user pairs far apart, so the running end of the
+    # episode never reaches into the next pair
+    t0 = start.min() if len(start) else 0
+    span = int(end.max() - t0) + episode_gap_sec + 1 if len(end) else 1
+    running = np.maximum.accumulate(rank * span + end - t0)
+    new = np.ones(len(start), dtype=bool)
+    new[1:] = rank[1:] * span + start[1:] - t0 > running[:-1] + episode_gap_sec
+    
+    episode = np.cumsum(new) - 1
+    firsts = np.flatnonzero(new)
+    closest = np.lexsort([distance, episode])
+    closest = closest[np.flatnonzero(np.diff(episode[closest], prepend=-1))]
+    return {
+        'a': a[closest],
+        'b': b[closest],
+        'start': start[firsts],
+        'end': np.maximum.reduceat(end, firsts) if len(firsts) else end,
+        'distance': distance[closest],
+        'matches': np.diff(np.append(firsts, len(start)))
+    }
+
+
+def colocation_join(df, radius_m=RADIUS_M, window_sec=WINDOW_SEC, episode_gap_sec=EPISODE_GAP_SEC,
+                    partition_sec=PARTITION_SEC, workers=WORKERS, pair_batch=PAIR_BATCH):
+    # Encounter episodes between users of a point table (compact schema),
+    # skipping points with a bad position when the table has QUALITY_FLAGS
+    if 'QUALITY_FLAGS' in df.columns:
+        from validation import BAD_POSITION
+        df = df[(df['QUALITY_FLAGS'].to_numpy() & BAD_POSITION) == 0]
+    df = df.dropna(subset=['Y_COORDINA', 'X_COORDINA', 'DATETIME']).sort_values('DATETIME', kind='stable')
+    lat = df['Y_COORDINA'].to_numpy(dtype=float)
+    lon = df['X_COORDINA'].to_numpy(dtype=float)
+    epoch = df['DATETIME'].to_numpy().astype('datetime64[s]').astype(np.int64)
+    user_codes, user_names = pd.factorize(df['USER_ID'].astype(str), sort=True)
+    
+    i, j, distance = partitioned_matches(lat, lon, epoch, user_codes, radius_m, window_sec,
+                                         partition_sec, workers, pair_batch)
+    episodes = encounter_episodes(i, j, distance, epoch, user_codes, episode_gap_sec)
+    trips = df['TRIP_ID'].to_numpy()
+    user_names = np.asarray(user_names, dtype=object)
+    encounters = pd.DataFrame({
+        'USER_A': user_names[user_codes[episodes['a']]],
+        'USER_B': user_names[user_codes[episodes['b']]],
+        'START': episodes['start'].astype('datetime64[s]'),
+        'END': episodes['end'].astype('datetime64[s]'),
+        'DURATION_SEC': episodes['end'] - episodes['start'],
+        'MIN_DISTANCE_M': episodes['distance'],
+        'MATCHES': episodes['matches'],
+        'TRIP_ID_A': trips[episodes['a']],
+        'TRIP_ID_B': trips[episodes['b']]
+    })
+    return encounters.sort_values(['START', 'USER_A', 'USER_B'], kind='stable').reset_index(drop=True)
+
+
+def main():
+    from task2 import load_gps_data
+    
+    print("="*80)
+    print("GPS CO-LOCATION JOIN")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT CSV:  {CSV_FILE}")
+    print(f"  OUTPUT:     {Path(CSV_FILE).parent / ENCOUNTER_FILE_NAME}")
+    print(f"  Within {RADIUS_M} m and {WINDOW_SEC}s, episodes split after {EPISODE_GAP_SEC}s")
+    print()
+    
+    try:
+        df = load_gps_data(CSV_FILE)
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {CSV_FILE}")
+        print("Please run Task 1 first!")
+        return
+    
+    encounters = colocation_join(df)
+    encounter_file = Path(CSV_FILE).parent / ENCOUNTER_FILE_NAME
+    encounters.to_csv(encounter_file, index=False)
+    
+    pairs = len(encounters[['USER_A', 'USER_B']].drop_duplicates())
+    print(f"✓ Found {len(encounters)} encounter episodes between {pairs} user pairs "
+          f"({int(encounters['MATCHES'].sum())} matching fixes)")
+    print(f"✓ Saved encounters to: {encounter_file}")
+    if len(encounters):
+        print()
+        print("Longest encounters:")
+        longest = encounters.sort_values('DURATION_SEC', ascending=False, kind='stable')
+        print(longest.head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+GPS Density Tiles
+Course: AMI23K - Lab 2
+"""
+
+import numpy as np
+from pathlib import Path
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
+
+# Level 0 cells are TILE_BASE_DEG wide; each further level halves the cell size
+TILE_BASE_DEG = 0.1
+TILE_LEVELS = 7
+# Largest grid (cells per side) returned when a level is picked automatically
+MAX_GRID_SIZE = 512
+
+# ============================================================================
+
+TILES_FILE_NAME = 'gps_density_tiles.npz'
+
+_ROW = 1 << 32
+_COL_OFFSET = 1 << 31
+
+
+def tiles_path(csv_file):
+    return Path(csv_file).parent / TILES_FILE_NAME
+
+
+def cell_size(tiles, level):
+    return float(tiles['base_deg']) / 2 ** level
+
+
+def _encode(iy, ix):
+    # Rows are the high bits, so sorted keys keep each grid row contiguous
+    return iy.astype(np.int64) * _ROW + (ix.astype(np.int64) + _COL_OFFSET)
+
+
+def _decode(keys):
+    return keys // _ROW, keys % _ROW - _COL_OFFSET
+
+
+def _aggregate(keys, counts, speed_sums):
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    return (
+        unique_keys,
+        np.bincount(inverse, weights=counts, minlength=len(unique_keys)).astype(np.int64),
+        np.bincount(inverse, weights=speed_sums, minlength=len(unique_keys))
+    )
+
+
+def _point_cells(lat, lon, speed, cell_deg):
+    keys = _encode(np.floor(lat / cell_deg), np.floor(lon / cell_deg))
+    return _aggregate(keys, np.ones(len(keys)), speed)
+
+
+def build_density_tiles(df, base_deg=TILE_BASE_DEG, levels=TILE_LEVELS, sources=()):
+    tiles = {'base_deg': np.float64(base_deg), 'levels': np.int64(levels)}
+    return update_density_tiles(tiles, df, sources)
+
+
+def tile_sources(tiles):
+    # Keys of the inputs counted so far, or None for tiles built without them
+    return set(tiles['sources'].tolist()) if 'sources' in tiles else None
+
+
+def update_density_tiles(tiles, df, sources=()):
+    # Adds the points of df to every level; counts and speed sums are
+    # additive, so new files can be folded in without touching old points.
+    # sources names what df holds (e.g. file fingerprints), so a caller can
+    # tell which inputs are already counted
+    lat = df['Y_COORDINA'].to_numpy(dtype=float)
+    lon = df['X_COORDINA'].to_numpy(dtype=float)
+    speed = df['SPEED'].to_numpy(dtype=float)
+    
+    # Build the finest level from the points, then each coarser level from
+    # the one below it (cells nest exactly since sizes halve)
+    finest = int(tiles['levels']) - 1
+    new_levels = {finest: _point_cells(lat, lon, speed, cell_size(tiles, finest))}
+    for level in range(finest - 1, -1, -1):
+        keys, counts, speed_sums = new_levels[level + 1]
+        iy, ix = _decode(keys)
+        new_levels[level] = _aggregate(_encode(iy // 2, ix // 2), counts, speed_sums)
+    
+    updated = dict(tiles)
+    updated['sources'] = np.array(sorted((tile_sources(tiles) or set()) | set(sources)), dtype=str)
+    for level, (keys, counts, speed_sums) in new_levels.items():
+        if f'keys_{level}' in tiles:
+            keys = np.concatenate([tiles[f'keys_{level}'], keys])
+            counts = np.concatenate([tiles[f'counts_{level}'], counts])
+            speed_sums = np.concatenate([tiles[f'speed_sums_{level}'], speed_sums])
+            keys, counts, speed_sums = _aggregate(keys, counts, speed_sums)
+        updated[f'keys_{level}'] = keys
+        updated[f'counts_{level}'] = counts
+        updated[f'speed_sums_{level}'] = speed_sums
+    return updated
+
+
+def save_density_tiles(tiles, tiles_file):
+    Path(tiles_file).parent.mkdir(exist_ok=True, parents=True)
+    np.savez(tiles_file, **tiles)
+
+
+def load_density_tiles(tiles_file):
+    with np.load(tiles_file) as data:
+        return {key: data[key] for key in data.files}
+
+
+def tile_cells(tiles, level=None):
+    # Centre coordinates, point counts and mean speed of every non-empty cell
+    if level is None:
+        level = int(tiles['levels']) - 1
+    cell_deg = cell_size(tiles, level)
+    iy, ix = _decode(tiles[f'keys_{level}'])
+    counts = tiles[f'counts_{level}']
+    return (
+        (ix + 0.5) * cell_deg,
+        (iy + 0.5) * cell_deg,
+        counts,
+        tiles[f'speed_sums_{level}'] / counts
+    )
+
+
+def _data_bbox(tiles):
+    iy, ix = _decode(tiles['keys_0'])
+    cell_deg = cell_size(tiles, 0)
+    return iy.min() * cell_deg, ix.min() * cell_deg, (iy.max() + 1) * cell_deg, (ix.max() + 1) * cell_deg
+
+
+def density_grid(tiles, bbox=None, level=None, max_size=MAX_GRID_SIZE):
+    # Dense count and mean-speed grids for bbox = (min_lat, min_lon, max_lat,
+    # max_lon). Without a level, picks the finest one that fits max_size.
+    # The work depends on the number of cells, never on the raw point count.
+    if bbox is None:
+        bbox = _data_bbox(tiles)
+    min_lat, min_lon, max_lat, max_lon = bbox
+    
+    if level is None:
+        level = 0
+        for candidate in range(int(tiles['levels'])):
+            cell_deg = cell_size(tiles, candidate)
+            if max((max_lat - min_lat) / cell_deg, (max_lon - min_lon) / cell_deg) > max_size:
+                break
+            level = candidate
+    cell_deg = cell_size(tiles, level)
+    
+    y0, y1 = int(np.floor(min_lat / cell_deg)), int(np.ceil(max_lat / cell_deg))
+    x0, x1 = int(np.floor(min_lon / cell_deg)), int(np.ceil(max_lon / cell_deg))
+    keys = tiles[f'keys_{level}']
+    lo, hi = np.searchsorted(keys, [y0 * _ROW, y1 * _ROW])
+    iy, ix = _decode(keys[lo:hi])
+    inside = (ix >= x0) & (ix < x1)
+    
+    counts = np.zeros((y1 - y0, x1 - x0), dtype=np.int64)
+    speed_sums = np.zeros((y1 - y0, x1 - x0))
+    counts[iy[inside] - y0, ix[inside] - x0] = tiles[f'counts_{level}'][lo:hi][inside]
+    speed_sums[iy[inside] - y0, ix[inside] - x0] = tiles[f'speed_sums_{level}'][lo:hi][inside]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_speed = np.where(counts > 0, speed_sums / counts, np.nan)
+    
+    extent = [x0 * cell_deg, x1 * cell_deg, y0 * cell_deg, y1 * cell_deg]
+    return counts, mean_speed, extent
+
+
+def plot_density(ax, tiles, bbox=None, level=None, value='count', cmap='YlOrRd'):
+    counts, mean_speed, extent = density_grid(tiles, bbox, level)
+    grid = np.where(counts > 0, counts, np.nan) if value == 'count' else mean_speed
+    return ax.imshow(grid, extent=extent, origin='lower', cmap=cmap, aspect='auto')
+
+
+def main():
+    from task2 import load_gps_data
+    
+    print("="*80)
+    print("GPS DENSITY TILES")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT CSV:  {CSV_FILE}")
+    print(f"  TILES:      {tiles_path(CSV_FILE)}")
+    print()
+    
+    try:
+        df = load_gps_data(CSV_FILE, columns=['Y_COORDINA', 'X_COORDINA', 'SPEED'])
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {CSV_FILE}")
+        print("Please run Task 1 first!")
+        return
+    
+    tiles = build_density_tiles(df)
+    save_density_tiles(tiles, tiles_path(CSV_FILE))
+    print(f"✓ Aggregated {len(df)} GPS points into {TILE_LEVELS} levels")
+    for level in range(TILE_LEVELS):
+        print(f"  Level {level}: {cell_size(tiles, level):.5f}° cells, {len(tiles[f'keys_{level}'])} non-empty")
+    print(f"✓ Saved tiles to: {tiles_path(CSV_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+GPS Pipeline Instrumentation
+Course: AMI23K - Lab 2
+"""
+
+from contextlib import contextmanager
+from collections import Counter
+from datetime import datetime
+import cProfile
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Stage to profile (None = no profiling). task1 stages: 'process_file',
+# 'combine', 'segment', 'write_csv', 'write_parquet', 'density_tiles',
+# 'write_xlsx', 'trip_summary'. With WORKERS > 1 the files are parsed in
+# worker processes, so 'process_file' only shows the parent waiting for them.
+PROFILE_STAGE = None
+# 'cprofile' (deterministic, slower) or 'sampling' (stack samples, low overhead)
+PROFILER = 'cprofile'
+SAMPLE_INTERVAL_SEC = 0.005
+# Functions listed per profiled stage in the run report
+PROFILE_TOP = 25
+
+# How often the process memory (RSS) is sampled while a stage runs
+MEMORY_SAMPLE_SEC = 0.01
+
+# ============================================================================
+
+
+def rss_bytes():
+    # Resident set size of this process, None where it cannot be read
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _sample_rss(stop, peak):
+    while not stop.wait(MEMORY_SAMPLE_SEC):
+        peak[0] = max(peak[0], rss_bytes())
+
+
+def _sample_stacks(thread_id, stop, samples):
+    # Counts every function on the sampled thread's stack once per sample
+    while not stop.wait(SAMPLE_INTERVAL_SEC):
+        frame = sys._current_frames().get(thread_id)
+        seen = set()
+        while frame is not None:
+            code = frame.f_code
+            seen.add(f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})")
+            frame = frame.f_back
+        samples.update(seen)
+        samples['<total>'] += 1
+
+
+def _cprofile_top(profiler, top=PROFILE_TOP):
+    stats = pstats.Stats(profiler).sort_stats('cumulative')
+    rows = []
+    for (file_name, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f"{os.path.basename(file_name)}:{line}({function})",
+            'calls': calls,
+            'own_sec': round(own, 4),
+            'cumulative_sec': round(cumulative, 4)
+        })
+    rows.sort(key=lambda row: row['cumulative_sec'], reverse=True)
+    return rows[:top]
+
+
+def _sampling_top(samples, top=PROFILE_TOP):
+    total = samples.pop('<total>', 0)
+    return [{'function': function, 'samples': count, 'share': round(count / total, 3)}
+            for function, count in samples.most_common(top)]
+
+
+def start_run(name):
+    # A run report collects one record per stage; pass it to stage() calls
+    return {
+        'run': name,
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'profile_stage': PROFILE_STAGE,
+        'profiler': PROFILER if PROFILE_STAGE else None,
+        'stages': [],
+        '_start': time.perf_counter()
+    }
+
+
+@contextmanager
+def stage(report, name, points=None, **fields):
+    # Times the block and records wall time, points/s and peak RSS in report.
+    # The block may set record['points'] once it knows the count. Does
+    # nothing when report is None; profiles the block when name is PROFILE_STAGE.
+    record = {'stage': name, **fields}
+    if report is None:
+        yield record
+        return
+    
+    peak = [rss_bytes()]
+    stop = threading.Event()
+    threads = []
+    if peak[0] is not None:
+        threads.append(threading.Thread(target=_sample_rss, args=(stop, peak), daemon=True))
+    profiler, samples = None, None
+    if name == PROFILE_STAGE and PROFILER == 'cprofile':
+        profiler = cProfile.Profile()
+    elif name == PROFILE_STAGE:
+        samples = Counter()
+        threads.append(threading.Thread(target=_sample_stacks, args=(threading.get_ident(), stop, samples),
+                                        daemon=True))
+    for thread in threads:
+        thread.start()
+    
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield record
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        seconds = time.perf_counter() - start
+        stop.set()
+        for thread in threads:
+            thread.join()
+        
+        points = record.get('points', points)
+        record['seconds'] = round(seconds, 4)
+        record['points'] = int(points) if points is not None else None
+        record['points_per_sec'] = round(points / seconds, 1) if points and seconds > 0 else None
+        record['peak_rss_mb'] = None
+        if peak[0] is not None:
+            record['peak_rss_mb'] = round(max(peak[0], rss_bytes()) / 2**20, 1)
+        if profiler is not None:
+            record['profile'] = _cprofile_top(profiler)
+        elif samples is not None:
+            record['profile'] = _sampling_top(samples)
+        report['stages'].append(record)
+
+
+def finish_run(report):
+    report['total_seconds'] = round(time.perf_counter() - report.pop('_start'), 4)
+    peaks = [record['peak_rss_mb'] for record in report['stages'] if record['peak_rss_mb'] is not None]
+    report['peak_rss_mb'] = max(peaks) if peaks else None
+    return report
+
+
+def save_run_report(report, report_file):
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+
+
+def print_run_report(report):
+    print("="*80)
+    print(f"STAGE TIMINGS ({report['run']}, {report['total_seconds']:.2f}s total):")
+    print("="*80)
+    for record in report['stages']:
+        label = record['stage'] + (f" [{record['file']}]" if 'file' in record else "")
+        rate = f"{record['points_per_sec']:12,.0f} points/s" if record['points_per_sec'] else " " * 21
+        memory = f"  peak RSS {record['peak_rss_mb']:.0f} MB" if record['peak_rss_mb'] is not None else ""
+        print(f"  {label:.<44} {record['seconds']:8.3f}s  {rate}{memory}")
+        for row in record.get('profile', [])[:10]:
+            cost = f"{row['cumulative_sec']:.3f}s" if 'cumulative_sec' in row else f"{row['share']:.1%}"
+            print(f"      {cost:>9}  {row['function']}")
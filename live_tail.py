@@ -0,0 +1,318 @@
+"""
+GPS Live Tail Mode
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import json
+import os
+import shutil
+import time
+from density_tiles import (build_density_tiles, load_density_tiles, save_density_tiles, tiles_path,
+                           update_density_tiles)
+from task1 import (TRIP_KEYS, chunk_to_dataframe, compute_metrics, finalize_trip_summary,
+                   merge_trip_accumulators, output_columns, parse_gsd_text, trip_accumulators,
+                   write_columnar)
+from validation import quality_flags
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+INPUT_FOLDER = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\data"
+OUTPUT_FOLDER = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results"
+
+# Seconds between two scans of INPUT_FOLDER
+POLL_SEC = 2
+# Largest block read from one file at a time (bounds memory while catching up)
+READ_BYTES = 1 << 26
+
+# Appended outputs: 'csv' and/or 'parquet' (new files in the USER_ID partitions)
+OUTPUT_FORMATS = ['csv', 'parquet']
+# Add QUALITY_FLAGS to the appended points (flags only, see validation.py)
+VALIDATE = True
+
+# ============================================================================
+
+STATE_FILE = 'tail_state.json'
+ACCUMULATOR_FILE = 'tail_trip_accumulators.csv'
+# Points carried per trip between appends. A point's flags depend on its
+# successor and the first point's on the second one, so with the two points
+# before it every flag a new point can change is checked again.
+CARRIED_POINTS = 3
+
+
+def load_tail_state(output_path):
+    # Per file: bytes consumed, the trip open at that offset and the last
+    # CARRIED_POINTS points (lat, lon, epoch, speed, ID, flags) of every trip
+    state_file = Path(output_path) / STATE_FILE
+    if not state_file.exists():
+        return None
+    with open(state_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_tail_state(output_path, state):
+    state_file = Path(output_path) / STATE_FILE
+    tmp_file = state_file.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, state_file)
+
+
+def load_trip_accumulators(output_path):
+    accumulator_file = Path(output_path) / ACCUMULATOR_FILE
+    if not accumulator_file.exists():
+        return None
+    return pd.read_csv(accumulator_file, index_col=TRIP_KEYS, parse_dates=['START', 'END'],
+                       dtype={'USER_ID': str, 'TRIP_ID': str})
+
+
+def reset_outputs(output_path):
+    # Outputs are rebuilt from the start of every file when there is no state
+    output_path = Path(output_path)
+    for name in ['gps_processed_data.csv', ACCUMULATOR_FILE]:
+        (output_path / name).unlink(missing_ok=True)
+    tiles_path(output_path / 'gps_processed_data.csv').unlink(missing_ok=True)
+    shutil.rmtree(output_path / 'gps_processed_data.parquet', ignore_errors=True)
+
+
+def read_appended(file_path, offset, read_bytes=READ_BYTES):
+    # Complete lines written after offset (at most read_bytes) and the new offset;
+    # a line still being written is left for the next read
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(read_bytes)
+    end = data.rfind(b'\n') + 1
+    return data[:end].decode('utf-8'), offset + end
+
+
+def _last_rows(keys, count):
+    # Positions of the last count rows of every key, in row order
+    codes, _ = pd.factorize(keys)
+    sizes = np.bincount(codes)
+    order = np.argsort(codes, kind='stable')
+    from_end = np.empty(len(codes), dtype=np.int64)
+    from_end[order] = np.repeat(np.cumsum(sizes), sizes) - 1 - np.arange(len(codes))
+    return np.flatnonzero(from_end < count)
+
+
+def continue_metrics(chunk, last_points, first_id, validate=VALIDATE):
+    # compute_metrics for newly parsed points, with the carried points of
+    # each of their trips prepended so the metrics continue across appends.
+    # Returns the points, the flags {ID: flags} of carried points whose
+    # check changed now that they have a successor, and the new last points.
+    trips = chunk['TRIP_ID']
+    carried = [trip for trip in np.unique(trips).tolist() if trip in last_points]
+    sizes = np.array([len(last_points[trip]) for trip in carried], dtype=np.int64)
+    previous = np.array([point for trip in carried for point in last_points[trip]], dtype=float).reshape(-1, 6)
+    n = len(previous)
+    
+    trip_ids = np.concatenate([np.array(carried, dtype=trips.dtype).repeat(sizes), trips])
+    lat = np.concatenate([previous[:, 0], chunk['Y_COORDINA']])
+    lon = np.concatenate([previous[:, 1], chunk['X_COORDINA']])
+    epoch = np.concatenate([previous[:, 2].astype(np.int64), chunk['EPOCH']])
+    speed = np.concatenate([previous[:, 3], chunk['SPEED']])
+    ids = np.concatenate([previous[:, 4].astype(np.int64), np.arange(first_id, first_id + len(trips))])
+    metrics = compute_metrics(trip_ids, lat, lon, epoch.astype('datetime64[s]'), speed)
+    
+    continued = dict(chunk)
+    continued.update({column: values[n:] for column, values in metrics.items()})
+    flags = np.concatenate([previous[:, 5], np.zeros(len(trips))]).astype(np.uint8)
+    corrections = {}
+    if validate:
+        checked = quality_flags(trip_ids, lat, lon, speed, metrics)
+        continued['QUALITY_FLAGS'] = checked[n:]
+        # The oldest of CARRIED_POINTS points stands in for the start of its
+        # trip, so its own check is kept
+        recheck = np.ones(len(trip_ids), dtype=bool)
+        recheck[(np.cumsum(sizes) - sizes)[sizes == CARRIED_POINTS]] = False
+        changed = np.flatnonzero(recheck[:n] & (checked[:n] != flags[:n]))
+        corrections = dict(zip(ids[changed].tolist(), checked[changed].tolist()))
+        flags = np.where(recheck, checked, flags)
+    
+    last = _last_rows(trip_ids, CARRIED_POINTS)
+    rows = np.column_stack([lat[last], lon[last], epoch[last], speed[last], ids[last], flags[last]]).tolist()
+    points = {}
+    for trip, row in zip(trip_ids[last].tolist(), rows):
+        points.setdefault(trip, []).append(row)
+    return continued, corrections, points
+
+
+def _correct_csv(csv_file, corrections, block_bytes=1 << 16):
+    # Rewrites the CSV from the first corrected row on; rows are in ID order
+    # and the corrected ones are recent, so only the end of the file is read
+    with open(csv_file, 'rb') as f:
+        columns = f.readline().decode('utf-8').rstrip('\r\n').split(',')
+        header_end = f.tell()
+        size = f.seek(0, os.SEEK_END)
+        start = size
+        while start > header_end:
+            start = max(start - block_bytes, header_end)
+            f.seek(start)
+            if start > header_end:
+                f.readline()
+            offset = f.tell()
+            line = f.readline()
+            if line and int(line.split(b',', 1)[0]) <= min(corrections):
+                break
+            block_bytes *= 2
+        f.seek(offset)
+        lines = f.read().decode('utf-8').split('\n')
+    
+    position = columns.index('QUALITY_FLAGS')
+    for i, line in enumerate(lines):
+        fields = line.split(',')
+        if len(fields) == len(columns) and int(fields[0]) in corrections:
+            # Keeps the '\r' of Windows line ends when the flags come last
+            ending = fields[position][len(fields[position].rstrip('\r')):]
+            fields[position] = str(corrections[int(fields[0])]) + ending
+            lines[i] = ','.join(fields)
+    with open(csv_file, 'r+b') as f:
+        f.seek(offset)
+        f.write('\n'.join(lines).encode('utf-8'))
+        f.truncate()
+
+
+def _correct_parquet(parquet_dir, user_id, corrections):
+    # The rows sit in part files of the user's partition, most likely the newest
+    remaining = dict(corrections)
+    parts = sorted(Path(parquet_dir, f'USER_ID={user_id}').rglob('*.parquet'),
+                   key=lambda part: part.stat().st_mtime, reverse=True)
+    for part in parts:
+        if not remaining:
+            break
+        table = pd.read_parquet(part)
+        found = table['ID'].isin(list(remaining))
+        if found.any():
+            flags = table.loc[found, 'ID'].map(remaining)
+            table.loc[found, 'QUALITY_FLAGS'] = flags.astype(table['QUALITY_FLAGS'].dtype)
+            table.to_parquet(part, index=False)
+            for row_id in table.loc[found, 'ID'].tolist():
+                del remaining[row_id]
+
+
+def correct_flags(corrections, user_id, output_path, output_formats=OUTPUT_FORMATS):
+    # Writes the rechecked flags of already appended points
+    output_path = Path(output_path)
+    if 'csv' in output_formats:
+        _correct_csv(output_path / 'gps_processed_data.csv', corrections)
+    if 'parquet' in output_formats:
+        _correct_parquet(output_path / 'gps_processed_data.parquet', user_id, corrections)
+
+
+def append_outputs(df, output_path, output_formats=OUTPUT_FORMATS):
+    output_path = Path(output_path)
+    if 'csv' in output_formats:
+        csv_file = output_path / 'gps_processed_data.csv'
+        df[output_columns(df)].to_csv(csv_file, mode='a', header=not csv_file.exists(), index=False)
+    if 'parquet' in output_formats:
+        write_columnar(df, output_path / 'gps_processed_data.parquet', append=True)
+
+
+def poll(input_path, output_path, state, accumulators, output_formats=OUTPUT_FORMATS,
+         validate=VALIDATE, read_bytes=READ_BYTES):
+    # Processes everything appended since the last poll; returns the number of
+    # new points per file and the updated trip accumulators
+    new_points = {}
+    # The density tiles take every appended block, so task2's heatmap keeps
+    # up without a rebuild; their sources mark them as built by this mode
+    tiles_file = tiles_path(Path(output_path) / 'gps_processed_data.csv')
+    tiles = load_density_tiles(tiles_file) if tiles_file.exists() else None
+    for gsd_file in sorted(Path(input_path).glob('*.gsd')):
+        entry = state['files'].setdefault(gsd_file.name, {'offset': 0, 'trip': None, 'last_points': {}})
+        size = gsd_file.stat().st_size
+        if size < entry['offset']:
+            print(f"  ⚠ {gsd_file.name} is shorter than before; delete {STATE_FILE} to rebuild")
+            continue
+        
+        while size > entry['offset']:
+            text, offset = read_appended(gsd_file, entry['offset'], read_bytes)
+            if offset == entry['offset']:
+                break
+            chunk, entry['trip'] = parse_gsd_text(text, entry['trip'])
+            entry['offset'] = offset
+            if chunk is None:
+                continue
+            
+            chunk, corrections, points = continue_metrics(chunk, entry['last_points'], state['next_id'], validate)
+            entry['last_points'].update(points)
+            df = chunk_to_dataframe(chunk, gsd_file.stem)
+            df.insert(0, 'ID', range(state['next_id'], state['next_id'] + len(df)))
+            state['next_id'] += len(df)
+            
+            append_outputs(df, output_path, output_formats)
+            if corrections:
+                correct_flags(corrections, gsd_file.stem, output_path, output_formats)
+            source = [f"tail:{gsd_file.name}"]
+            if tiles is None:
+                tiles = build_density_tiles(df, sources=source)
+            else:
+                tiles = update_density_tiles(tiles, df, source)
+            partial = trip_accumulators(df)
+            accumulators = partial if accumulators is None else merge_trip_accumulators([accumulators, partial])
+            new_points[gsd_file.name] = new_points.get(gsd_file.name, 0) + len(df)
+    
+    if new_points:
+        accumulators.to_csv(Path(output_path) / ACCUMULATOR_FILE)
+        save_density_tiles(tiles, tiles_file)
+        finalize_trip_summary(accumulators).to_csv(Path(output_path) / 'trip_summary.csv', index=False)
+    save_tail_state(output_path, state)
+    return new_points, accumulators
+
+
+def follow(input_folder, output_folder, poll_sec=POLL_SEC, output_formats=OUTPUT_FORMATS,
+           validate=VALIDATE, max_polls=None):
+    # Polls until interrupted (or max_polls scans); the first poll without a
+    # saved state processes every file from the start
+    output_path = Path(output_folder)
+    output_path.mkdir(exist_ok=True, parents=True)
+    state = load_tail_state(output_path)
+    if state is None:
+        print(f"No {STATE_FILE} found: building the outputs from the start of every file")
+        reset_outputs(output_path)
+        state = {'next_id': 1, 'files': {}}
+    accumulators = load_trip_accumulators(output_path)
+    
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            start = time.perf_counter()
+            new_points, accumulators = poll(input_folder, output_path, state, accumulators,
+                                            output_formats, validate)
+            seconds = time.perf_counter() - start
+            for name, points in new_points.items():
+                print(f"  ✓ {name}: +{points} GPS points")
+            if new_points:
+                print(f"  Updated outputs in {seconds:.2f}s ({state['next_id'] - 1} points, "
+                      f"{len(accumulators)} trips in total)")
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                time.sleep(max(poll_sec - seconds, 0))
+    except KeyboardInterrupt:
+        print("Stopped following.")
+    return state
+
+
+def main():
+    print("="*80)
+    print("GPS LIVE TAIL MODE")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT:  {INPUT_FOLDER}")
+    print(f"  OUTPUT: {OUTPUT_FOLDER}")
+    print(f"  Polling every {POLL_SEC}s, press Ctrl+C to stop")
+    print()
+    
+    if not Path(INPUT_FOLDER).exists():
+        print(f"ERROR: Folder not found: {INPUT_FOLDER}")
+        return
+    follow(INPUT_FOLDER, OUTPUT_FOLDER)
+
+
+if __name__ == "__main__":
+    main()
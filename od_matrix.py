@@ -0,0 +1,270 @@
+"""
+GPS Origin-Destination Flow Matrix
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from task1 import TRIP_KEYS
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
+
+# Zones: 'grid' (square cells of CELL_DEG degrees) or 'geohash'
+ZONES = 'grid'
+CELL_DEG = 0.01
+GEOHASH_PRECISION = 6
+# Also slice the counts by hour of day (of the trip start) and/or by user
+BY_HOUR = False
+BY_USER = False
+# Add the trips of CSV_FILE to the existing od_matrix.npz instead of
+# replacing it; trips it already counts (same user, trip and start time)
+# are skipped, so the CSV may hold the old trips as well
+MERGE_EXISTING = False
+
+# ============================================================================
+
+OD_FILE_NAME = 'od_matrix.npz'
+OD_TABLE_FILE_NAME = 'od_flows.csv'
+
+_ROW = 1 << 32
+_COL_OFFSET = 1 << 31
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+OD_COLUMNS = ['origin', 'destination', 'hour', 'user', 'trips']
+
+
+def od_path(csv_file):
+    return Path(csv_file).parent / OD_FILE_NAME
+
+
+def geohash_codes(lat, lon, precision=GEOHASH_PRECISION):
+    # Geohash cells as integers (5 bits per character, longitude bit first)
+    bits = 5 * precision
+    lon_bits, lat_bits = (bits + 1) // 2, bits // 2
+    ilon = np.clip(np.floor((lon + 180) / 360 * 2**lon_bits), 0, 2**lon_bits - 1).astype(np.int64)
+    ilat = np.clip(np.floor((lat + 90) / 180 * 2**lat_bits), 0, 2**lat_bits - 1).astype(np.int64)
+    codes = np.zeros(len(ilon), dtype=np.int64)
+    for i in range(bits):
+        if i % 2 == 0:
+            bit = (ilon >> (lon_bits - 1 - i // 2)) & 1
+        else:
+            bit = (ilat >> (lat_bits - 1 - i // 2)) & 1
+        codes = (codes << 1) | bit
+    return codes
+
+
+def geohash_centres(codes, precision=GEOHASH_PRECISION):
+    bits = 5 * precision
+    lon_bits, lat_bits = (bits + 1) // 2, bits // 2
+    ilon = np.zeros(len(codes), dtype=np.int64)
+    ilat = np.zeros(len(codes), dtype=np.int64)
+    for i in range(bits):
+        bit = (codes >> (bits - 1 - i)) & 1
+        if i % 2 == 0:
+            ilon = (ilon << 1) | bit
+        else:
+            ilat = (ilat << 1) | bit
+    return (ilat + 0.5) / 2**lat_bits * 180 - 90, (ilon + 0.5) / 2**lon_bits * 360 - 180
+
+
+def zone_keys(lat, lon, zones=ZONES, cell_deg=CELL_DEG, precision=GEOHASH_PRECISION):
+    if zones == 'geohash':
+        return geohash_codes(lat, lon, precision)
+    if zones == 'grid':
+        iy, ix = np.floor(lat / cell_deg), np.floor(lon / cell_deg)
+        return iy.astype(np.int64) * _ROW + (ix.astype(np.int64) + _COL_OFFSET)
+    raise ValueError(f"unknown zones {zones!r} (expected 'grid' or 'geohash')")
+
+
+def zone_labels(od, keys):
+    # Zone names and centre coordinates for zone keys of od
+    if str(od['zones']) == 'geohash':
+        precision = int(od['precision'])
+        labels = [''.join(_BASE32[(key >> 5 * (precision - 1 - i)) & 31] for i in range(precision))
+                  for key in keys.tolist()]
+        lat, lon = geohash_centres(keys, precision)
+        return labels, lat, lon
+    cell_deg = float(od['cell_deg'])
+    iy, ix = keys // _ROW, keys % _ROW - _COL_OFFSET
+    labels = [f"{y}_{x}" for y, x in zip(iy.tolist(), ix.tolist())]
+    return labels, (iy + 0.5) * cell_deg, (ix + 0.5) * cell_deg
+
+
+def _aggregate(origin, destination, hour, user, trips):
+    # Sums the trips of identical (origin, destination, hour, user) entries
+    order = np.lexsort([user, hour, destination, origin])
+    columns = [values[order] for values in (origin, destination, hour, user)]
+    changed = np.zeros(len(order), dtype=bool)
+    changed[:1] = True
+    for values in columns:
+        changed[1:] |= values[1:] != values[:-1]
+    starts = np.flatnonzero(changed)
+    counts = np.add.reduceat(trips[order], starts) if len(order) else trips[:0]
+    return [values[starts] for values in columns] + [counts]
+
+
+def trip_endpoints(df):
+    # First and last point (by time) of every trip, skipping points with a
+    # bad position when the table has QUALITY_FLAGS
+    if 'QUALITY_FLAGS' in df.columns:
+        from validation import BAD_POSITION
+        df = df[(df['QUALITY_FLAGS'].to_numpy() & BAD_POSITION) == 0]
+    df = df.sort_values(TRIP_KEYS + ['DATETIME'], kind='stable')
+    group = df.groupby(TRIP_KEYS, sort=False, observed=True).ngroup().to_numpy()
+    first = np.flatnonzero(np.diff(group, prepend=-1) != 0)
+    last = np.append(first[1:], len(group)) - 1
+    return df.iloc[first].reset_index(drop=True), df.iloc[last].reset_index(drop=True)
+
+
+def trip_sources(start):
+    # Key of every trip (user, trip and start time) as stored in 'sources'
+    return (start['USER_ID'].astype(str) + '/' + start['TRIP_ID'].astype(str) + '/'
+            + start['DATETIME'].dt.strftime('%Y-%m-%dT%H:%M:%S')).to_numpy(dtype=str)
+
+
+def build_od_matrix(df, zones=ZONES, cell_deg=CELL_DEG, precision=GEOHASH_PRECISION,
+                    by_hour=BY_HOUR, by_user=BY_USER, skip_sources=None):
+    # Sparse trip counts per (origin zone, destination zone[, hour][, user]),
+    # stored as coordinate arrays; counts add up, see merge_od_matrices.
+    # The keys of the counted trips are kept in 'sources'; trips whose key
+    # is in skip_sources (e.g. of a saved matrix) are left out.
+    start, end = trip_endpoints(df)
+    sources = trip_sources(start)
+    if skip_sources is not None:
+        new = ~np.isin(sources, skip_sources)
+        start, end, sources = start[new].reset_index(drop=True), end[new].reset_index(drop=True), sources[new]
+    origin = zone_keys(start['Y_COORDINA'].to_numpy(dtype=float), start['X_COORDINA'].to_numpy(dtype=float),
+                       zones, cell_deg, precision)
+    destination = zone_keys(end['Y_COORDINA'].to_numpy(dtype=float), end['X_COORDINA'].to_numpy(dtype=float),
+                            zones, cell_deg, precision)
+    hour = start['DATETIME'].dt.hour.to_numpy(dtype=np.int64) if by_hour else np.full(len(start), -1)
+    user_codes, users = pd.factorize(start['USER_ID'].astype(str), sort=True)
+    user = user_codes.astype(np.int64) if by_user else np.full(len(start), -1)
+    
+    od = {
+        'zones': np.array(zones),
+        'cell_deg': np.float64(cell_deg),
+        'precision': np.int64(precision),
+        'by_hour': np.bool_(by_hour),
+        'by_user': np.bool_(by_user),
+        'users': np.asarray(users, dtype=str) if by_user else np.array([], dtype=str),
+        'sources': np.sort(sources)
+    }
+    od.update(zip(OD_COLUMNS, _aggregate(origin, destination, hour, user, np.ones(len(start), dtype=np.int64))))
+    return od
+
+
+def merge_od_matrices(od, other):
+    # Sum of two OD matrices with the same zones and slicing (for disjoint
+    # sets of trips; build the second one with skip_sources to ensure that)
+    for key in ['zones', 'cell_deg', 'precision', 'by_hour', 'by_user']:
+        if od[key] != other[key]:
+            raise ValueError(f"OD matrices differ in {key}: {od[key]} != {other[key]}")
+    users = np.union1d(od['users'], other['users'])
+    
+    def user_codes(matrix):
+        codes = matrix['user']
+        if len(matrix['users']) == 0:
+            return codes
+        return np.where(codes >= 0, np.searchsorted(users, matrix['users'])[np.maximum(codes, 0)], -1)
+    
+    merged = {key: od[key] for key in ['zones', 'cell_deg', 'precision', 'by_hour', 'by_user']}
+    merged['users'] = users
+    if 'sources' in od and 'sources' in other:
+        merged['sources'] = np.union1d(od['sources'], other['sources'])
+    columns = [np.concatenate([od[c], other[c]]) for c in ['origin', 'destination', 'hour']]
+    columns.append(np.concatenate([user_codes(od), user_codes(other)]))
+    columns.append(np.concatenate([od['trips'], other['trips']]))
+    merged.update(zip(OD_COLUMNS, _aggregate(*columns)))
+    return merged
+
+
+def save_od_matrix(od, od_file):
+    Path(od_file).parent.mkdir(exist_ok=True, parents=True)
+    np.savez_compressed(od_file, **od)
+
+
+def load_od_matrix(od_file):
+    with np.load(od_file) as data:
+        return {key: data[key] for key in data.files}
+
+
+def od_table(od, by_hour=True, by_user=True):
+    # The non-zero flows as a DataFrame, largest first; slices that are not
+    # requested (or not stored) are summed over
+    hour = od['hour'] if by_hour else np.full(len(od['hour']), -1)
+    user = od['user'] if by_user else np.full(len(od['user']), -1)
+    origin, destination, hour, user, trips = _aggregate(od['origin'], od['destination'], hour, user, od['trips'])
+    
+    origin_labels, origin_lat, origin_lon = zone_labels(od, origin)
+    destination_labels, destination_lat, destination_lon = zone_labels(od, destination)
+    table = pd.DataFrame({
+        'ORIGIN': origin_labels,
+        'DESTINATION': destination_labels,
+        'ORIGIN_LAT': origin_lat,
+        'ORIGIN_LON': origin_lon,
+        'DESTINATION_LAT': destination_lat,
+        'DESTINATION_LON': destination_lon,
+        'TRIPS': trips
+    })
+    if by_hour and bool(od['by_hour']):
+        table.insert(2, 'HOUR', hour)
+    if by_user and bool(od['by_user']):
+        table.insert(2, 'USER_ID', od['users'][user])
+    return table.sort_values('TRIPS', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def main():
+    from task2 import load_gps_data
+    
+    print("="*80)
+    print("GPS ORIGIN-DESTINATION MATRIX")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT CSV:  {CSV_FILE}")
+    print(f"  OUTPUT:     {od_path(CSV_FILE)}")
+    zones = f"{CELL_DEG} degree grid" if ZONES == 'grid' else f"geohash precision {GEOHASH_PRECISION}"
+    slices = [name for name, on in [('hour', BY_HOUR), ('user', BY_USER)] if on]
+    print(f"  Zones: {zones}, sliced by {', '.join(slices) or 'nothing'}")
+    print()
+    
+    try:
+        df = load_gps_data(CSV_FILE)
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {CSV_FILE}")
+        print("Please run Task 1 first!")
+        return
+    
+    od_file = od_path(CSV_FILE)
+    existing = load_od_matrix(od_file) if MERGE_EXISTING and od_file.exists() else None
+    if existing is not None and 'sources' not in existing:
+        print(f"⚠ {od_file} does not list its trips, so it is replaced instead of merged")
+        existing = None
+    if existing is not None:
+        new_trips = build_od_matrix(df, skip_sources=existing['sources'])
+        od = merge_od_matrices(existing, new_trips)
+        print(f"✓ Merged {len(new_trips['sources'])} new trips into the existing matrix: {od_file}")
+    else:
+        od = build_od_matrix(df)
+    save_od_matrix(od, od_file)
+    table_file = Path(CSV_FILE).parent / OD_TABLE_FILE_NAME
+    table = od_table(od)
+    table.to_csv(table_file, index=False)
+    
+    zone_count = len(np.union1d(od['origin'], od['destination']))
+    print(f"✓ {int(od['trips'].sum())} trips in {len(od['trips'])} non-zero flows between {zone_count} zones")
+    print(f"✓ Saved OD matrix to: {od_file}")
+    print(f"✓ Saved flow table to: {table_file}")
+    print()
+    print("Largest flows:")
+    print(table.head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+GPS Processing Pipeline (in memory)
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+from pathlib import Path
+import filecmp
+import shutil
+from task1 import (EXCEL_MAX_ROWS, TRIP_KEYS, VALIDATE, WORKERS, add_metrics, calculate_trip_summary,
+                   file_results, output_table, parse_gsd_arrays, point_table, process_all_gsd_files,
+                   write_columnar)
+from task2 import (FIGURE_DPI, FIGURE_FORMATS, FIGURE_SETS, FIGURE_WORKERS, print_summary_statistics,
+                   render_all_figures, save_summary_statistics, summary_statistics)
+from instrumentation import finish_run, print_run_report, save_run_report, stage, start_run
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+INPUT_FOLDER = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\data"
+OUTPUT_FOLDER = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results"
+
+# Stages to run, any of 'parse', 'metrics', 'segment', 'summary' and 'visualize';
+# 'segment' splits trips on time gaps and stay points (see segmentation.py)
+STAGES = ['parse', 'metrics', 'summary', 'visualize']
+# Files to write: point table formats ('csv', 'parquet', 'xlsx'), 'trip_summary',
+# 'summary_statistics', 'quality_report' and 'stay_points' (with 'segment'). The data only passes between
+# stages in memory; [] writes nothing but the figures of 'visualize'.
+OUTPUTS = ['trip_summary', 'summary_statistics']
+# Write run_report_pipeline.json (time, points/s and peak RSS per stage)
+RUN_REPORT = True
+# Folder for a consistency check: task1 and the pipeline both write their
+# files into it, which must be byte-identical (None skips the check)
+CHECK_FOLDER = None
+
+# ============================================================================
+
+STAGE_ORDER = ['parse', 'metrics', 'segment', 'summary', 'visualize']
+CHECKED_FILES = ['gps_processed_data.csv', 'trip_summary.csv']
+REQUIRED_STAGE = {'metrics': 'parse', 'segment': 'metrics', 'summary': 'metrics', 'visualize': 'metrics'}
+
+
+def check_stages(stages):
+    for name in stages:
+        if name not in STAGE_ORDER:
+            raise ValueError(f"unknown stage {name!r} (expected one of {STAGE_ORDER})")
+        if name in REQUIRED_STAGE and REQUIRED_STAGE[name] not in stages:
+            raise ValueError(f"stage {name!r} needs the {REQUIRED_STAGE[name]!r} stage")
+
+
+def save_outputs(results, output_path, outputs, report=None):
+    output_path = Path(output_path)
+    output_path.mkdir(exist_ok=True, parents=True)
+    points = results.get('points')
+    
+    if points is not None and ('csv' in outputs or 'xlsx' in outputs):
+        table = output_table(points)
+        if 'csv' in outputs:
+            with stage(report, 'write_csv', len(table)):
+                table.to_csv(output_path / 'gps_processed_data.csv', index=False)
+            print(f"✓ Saved detailed GPS data to: {output_path / 'gps_processed_data.csv'}")
+        if 'xlsx' in outputs and len(table) > EXCEL_MAX_ROWS:
+            print(f"⚠ Skipping Excel file: {len(table)} rows exceed the Excel row limit")
+        elif 'xlsx' in outputs:
+            with stage(report, 'write_xlsx', len(table)):
+                table.to_excel(output_path / 'gps_processed_data.xlsx', index=False)
+            print(f"✓ Saved Excel file to: {output_path / 'gps_processed_data.xlsx'}")
+    
+    if points is not None and 'parquet' in outputs:
+        try:
+            with stage(report, 'write_parquet', len(points)):
+                write_columnar(points, output_path / 'gps_processed_data.parquet')
+            print(f"✓ Saved columnar data to: {output_path / 'gps_processed_data.parquet'}")
+        except ImportError as e:
+            print(f"⚠ Skipping Parquet output: {e}")
+    elif points is not None and 'csv' in outputs and (output_path / 'gps_processed_data.parquet').exists():
+        # task2 reads the store ahead of the CSV, so an old one must not stay behind
+        shutil.rmtree(output_path / 'gps_processed_data.parquet')
+        print(f"✓ Removed outdated columnar data: {output_path / 'gps_processed_data.parquet'}")
+    
+    if results.get('trip_summary') is not None and 'trip_summary' in outputs:
+        results['trip_summary'].to_csv(output_path / 'trip_summary.csv', index=False)
+        print(f"✓ Saved trip summary to: {output_path / 'trip_summary.csv'}")
+    if results.get('quality_report') is not None and 'quality_report' in outputs:
+        # Imported here since validation itself builds on task1
+        from validation import FILE_REPORT_FILE_NAME, REPORT_FILE_NAME, file_quality_report
+        results['quality_report'].to_csv(output_path / REPORT_FILE_NAME, index=False)
+        file_quality_report(results['quality_report']).to_csv(output_path / FILE_REPORT_FILE_NAME, index=False)
+        print(f"✓ Saved quality reports to: {output_path / REPORT_FILE_NAME}")
+    if results.get('stay_points') is not None and 'stay_points' in outputs:
+        results['stay_points'].to_csv(output_path / 'stay_points.csv', index=False)
+        print(f"✓ Saved stay points to: {output_path / 'stay_points.csv'}")
+    if results.get('summary_statistics') is not None and 'summary_statistics' in outputs:
+        save_summary_statistics(results['summary_statistics'], output_path / 'summary_statistics.txt')
+        print(f"✓ Saved summary statistics to: {output_path / 'summary_statistics.txt'}")
+
+
+def run_pipeline(input_folder, output_folder=None, stages=STAGES, outputs=OUTPUTS, workers=WORKERS,
+                 validate=VALIDATE, figure_workers=FIGURE_WORKERS, dpi=FIGURE_DPI,
+                 formats=FIGURE_FORMATS, figure_sets=FIGURE_SETS, report=None):
+    # Runs the selected stages in this process, handing the typed arrays and
+    # DataFrames from stage to stage. Returns a dict with 'points' (the
+    # task1.point_table), 'trip_summary', 'quality_report', 'stay_points',
+    # 'summary_statistics' and 'figures' (the figure folder), for the stages that ran. Files are
+    # only written for `outputs` and the figures; both need output_folder.
+    check_stages(stages)
+    if output_folder is None and (outputs or 'visualize' in stages):
+        raise ValueError("output_folder is needed to write outputs or figures")
+    results = {}
+    if 'parse' not in stages:
+        return results
+    
+    gsd_files = sorted(Path(input_folder).glob('*.gsd'))
+    file_arrays, quality_reports = {}, []
+    # With workers > 1 a file's time is how long the main process waited for it
+    for gsd_file, get_result in file_results(gsd_files, workers, process=parse_gsd_arrays):
+        # A file that fails is reported and skipped, as in task1
+        try:
+            with stage(report, 'parse', file=gsd_file.name) as record:
+                arrays = get_result()
+                record['points'] = len(arrays['TRIP_ID']) if arrays is not None else 0
+            if arrays is None:
+                print(f"  ⚠ No data found in {gsd_file.name}")
+                continue
+            
+            if 'metrics' in stages:
+                with stage(report, 'metrics', len(arrays['TRIP_ID']), file=gsd_file.name):
+                    arrays = add_metrics(arrays)
+                    if validate:
+                        # Imported here since validation itself builds on task1
+                        from validation import validate_arrays
+                        arrays, trip_quality = validate_arrays(arrays, gsd_file.name)
+                        quality_reports.append(trip_quality)
+            file_arrays[gsd_file.stem] = arrays
+        except Exception as e:
+            print(f"  ✗ Error processing {gsd_file.name}: {e}")
+    
+    if not file_arrays:
+        print(f"ERROR: No GPS points found in: {input_folder}")
+        return results
+    
+    with stage(report, 'combine') as record:
+        points = results['points'] = point_table(file_arrays)
+        record['points'] = len(points)
+    files = len(file_arrays)
+    del file_arrays
+    print(f"✓ Processed {len(points)} GPS points from {files} files")
+    if quality_reports:
+        results['quality_report'] = pd.concat(quality_reports, ignore_index=True)
+    
+    if 'segment' in stages:
+        # Imported here since segmentation itself builds on task1
+        from segmentation import segment_point_table
+        with stage(report, 'segment', len(points)):
+            trips = points.groupby(TRIP_KEYS, observed=True).ngroups
+            points, results['stay_points'] = segment_point_table(points)
+            results['points'] = points
+        print(f"✓ Split {trips} logger trips into {points.groupby(TRIP_KEYS, observed=True).ngroups} "
+              f"trips at {len(results['stay_points'])} stay points")
+    
+    if 'summary' in stages:
+        with stage(report, 'trip_summary', len(points)):
+            results['trip_summary'] = calculate_trip_summary(points)
+        with stage(report, 'summary_statistics', len(points)):
+            results['summary_statistics'] = summary_statistics(points)
+        print(f"✓ Summarized {len(results['trip_summary'])} trips")
+    
+    if 'visualize' in stages:
+        results['figures'] = render_all_figures(points, Path(output_folder) / 'figures', figure_workers,
+                                                dpi, formats, figure_sets, report=report)
+    
+    if outputs:
+        save_outputs(results, output_folder, outputs, report)
+    return results
+
+
+def check_against_task1(input_folder, check_folder, workers=WORKERS, validate=VALIDATE, segment=False):
+    # Writes the CHECKED_FILES of task1 and of the pipeline for the same input
+    # into check_folder/task1 and check_folder/pipeline; returns
+    # {file name: True if the two are byte-identical}
+    check_path = Path(check_folder)
+    process_all_gsd_files(input_folder, check_path / 'task1', workers, output_formats=['csv'],
+                          validate=validate, segment=segment)
+    stages = ['parse', 'metrics'] + (['segment'] if segment else []) + ['summary']
+    run_pipeline(input_folder, check_path / 'pipeline', stages, ['csv', 'trip_summary'], workers, validate)
+    return {name: filecmp.cmp(check_path / 'task1' / name, check_path / 'pipeline' / name, shallow=False)
+            for name in CHECKED_FILES}
+
+
+def main():
+    print("="*80)
+    print("GPS PROCESSING PIPELINE")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT:  {INPUT_FOLDER}")
+    print(f"  OUTPUT: {OUTPUT_FOLDER}")
+    print(f"  Stages: {', '.join(STAGES)}")
+    print(f"  Outputs: {', '.join(OUTPUTS) or 'none'}")
+    print()
+    
+    report = start_run('pipeline') if RUN_REPORT else None
+    results = run_pipeline(INPUT_FOLDER, OUTPUT_FOLDER, report=report)
+    
+    if results.get('summary_statistics') is not None:
+        print()
+        print_summary_statistics(results['summary_statistics'])
+    
+    if report is not None and report['stages']:
+        finish_run(report)
+        report_file = Path(OUTPUT_FOLDER) / 'run_report_pipeline.json'
+        Path(OUTPUT_FOLDER).mkdir(exist_ok=True, parents=True)
+        save_run_report(report, report_file)
+        print()
+        print_run_report(report)
+        print(f"✓ Saved run report to: {report_file}")
+    
+    if CHECK_FOLDER is not None:
+        print()
+        print(f"Checking the pipeline against task1 in: {CHECK_FOLDER}")
+        for name, identical in check_against_task1(INPUT_FOLDER, CHECK_FOLDER, segment='segment' in STAGES).items():
+            print(f"  {'✓' if identical else '✗'} {name}: {'identical' if identical else 'DIFFERENT'}")
+
+
+if __name__ == "__main__":
+    main()
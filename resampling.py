@@ -0,0 +1,178 @@
+"""
+GPS Fixed-Interval Trajectory Resampling
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from task1 import (METRIC_COLUMNS, TRIP_KEYS, compute_metrics, date_time_strings,
+                   finalize_trip_summary, merge_trip_accumulators, output_columns, to_compact,
+                   trip_accumulators)
+from streaming_statistics import finalize_statistics, merge_statistics, statistics_partial
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
+
+# Time step of the resampled trajectories (e.g. 1, 5 or 30 seconds); the
+# samples fall on whole multiples of the step, so users line up in time
+STEP_SEC = 5
+# Gaps between two fixes longer than this are left without samples
+MAX_GAP_SEC = 60
+# Trips resampled at a time; bounds memory for small steps and long trips
+TRIPS_PER_CHUNK = 2000
+
+# ============================================================================
+
+INPUT_COLUMNS = ['TRIP_ID', 'USER_ID', 'Y_COORDINA', 'X_COORDINA', 'DATETIME', 'SPEED', 'HEIGHT']
+INTERPOLATED_COLUMNS = ['Y_COORDINA', 'X_COORDINA', 'SPEED', 'HEIGHT']
+
+
+def resampled_path(csv_file, step_sec=STEP_SEC):
+    return Path(csv_file).parent / f'gps_resampled_{step_sec}s.csv'
+
+
+def resample_points(group, epoch, values, step_sec=STEP_SEC, max_gap_sec=MAX_GAP_SEC):
+    # Linear interpolation at every multiple of step_sec between consecutive
+    # fixes of a group that are at most max_gap_sec apart; rows must be sorted
+    # by group and time. Returns the source row of each sample, its time and
+    # the interpolated columns.
+    same = group[1:] == group[:-1]
+    a = np.flatnonzero(same)
+    b = a + 1
+    gap = epoch[b] - epoch[a]
+    filled = (gap > 0) & (gap <= max_gap_sec)
+    
+    # Fixes on the grid that no segment covers: the end of a group or of a
+    # filled stretch (a fix followed by one with the same time is covered)
+    uncovered = np.ones(len(epoch), dtype=bool)
+    uncovered[a[filled | (gap == 0)]] = False
+    last = np.flatnonzero(uncovered & (epoch % step_sec == 0))
+    
+    # Samples in [t_a, t_b) for each filled segment
+    a, b, gap = a[filled], b[filled], gap[filled]
+    first = -(-epoch[a] // step_sec)
+    counts = np.maximum(-(-epoch[b] // step_sec) - first, 0)
+    
+    segment = np.repeat(np.arange(len(a)), counts)
+    offsets = np.cumsum(counts) - counts
+    times = (first[segment] + np.arange(counts.sum()) - offsets[segment]) * step_sec
+    fraction = (times - epoch[a][segment]) / gap[segment]
+    
+    rows = np.concatenate([a[segment], last])
+    times = np.concatenate([times, epoch[last]])
+    fraction = np.concatenate([fraction, np.zeros(len(last))])
+    order = np.lexsort([times, group[rows]])
+    rows, times, fraction = rows[order], times[order], fraction[order]
+    nxt = np.minimum(rows + 1, len(epoch) - 1)
+    
+    interpolated = {column: np.where(fraction > 0, v[rows] + fraction * (v[nxt] - v[rows]), v[rows])
+                    for column, v in values.items()}
+    return rows, times, interpolated
+
+
+def iter_resampled(df, step_sec=STEP_SEC, max_gap_sec=MAX_GAP_SEC, trips_per_chunk=TRIPS_PER_CHUNK):
+    # Yields the resampled point table (compact schema, with recomputed
+    # metrics) for trips_per_chunk trips at a time
+    time_column = 'DATETIME_OBJ' if 'DATETIME_OBJ' in df.columns else 'DATETIME'
+    df = df.sort_values(TRIP_KEYS + [time_column], kind='stable').reset_index(drop=True)
+    group = df.groupby(TRIP_KEYS, sort=False, observed=True).ngroup().to_numpy()
+    epoch = df[time_column].to_numpy().astype('datetime64[s]').astype(np.int64)
+    values = {column: df[column].to_numpy(dtype=float, na_value=np.nan) for column in INTERPOLATED_COLUMNS}
+    bounds = np.searchsorted(group, np.arange(0, group.max() + 1 if len(group) else 0, trips_per_chunk))
+    bounds = np.append(bounds, len(group))
+    
+    next_id = 1
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        rows, times, interpolated = resample_points(
+            group[start:stop], epoch[start:stop],
+            {column: v[start:stop] for column, v in values.items()}, step_sec, max_gap_sec)
+        if len(rows) == 0:
+            continue
+        rows = rows + start
+        
+        chunk = pd.DataFrame({
+            'ID': np.arange(next_id, next_id + len(rows)),
+            'TRIP_ID': df['TRIP_ID'].to_numpy()[rows],
+            'USER_ID': df['USER_ID'].array.take(rows),
+            'Y_COORDINA': interpolated['Y_COORDINA'],
+            'X_COORDINA': interpolated['X_COORDINA'],
+            'DATETIME': times.astype('datetime64[s]'),
+            'SPEED': interpolated['SPEED'],
+            'HEIGHT': np.round(interpolated['HEIGHT'])
+        })
+        chunk.insert(3, 'POINT_ID', chunk.groupby(TRIP_KEYS, sort=False).cumcount() + 1)
+        metrics = compute_metrics(group[rows], interpolated['Y_COORDINA'], interpolated['X_COORDINA'],
+                                  times.astype('datetime64[s]'), interpolated['SPEED'])
+        for column in METRIC_COLUMNS:
+            chunk[column] = metrics[column]
+        next_id += len(chunk)
+        yield to_compact(chunk)
+
+
+def resample_trips(df, step_sec=STEP_SEC, max_gap_sec=MAX_GAP_SEC, trips_per_chunk=TRIPS_PER_CHUNK):
+    chunks = list(iter_resampled(df, step_sec, max_gap_sec, trips_per_chunk))
+    if not chunks:
+        return to_compact(pd.DataFrame(columns=INPUT_COLUMNS))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def save_resampled(chunks, resampled_file):
+    # Same layout as gps_processed_data.csv, written chunk by chunk; returns
+    # the trip summary and summary statistics of the resampled points
+    Path(resampled_file).parent.mkdir(exist_ok=True, parents=True)
+    accumulators, partials = [], []
+    for i, chunk in enumerate(chunks):
+        dates, times = date_time_strings(chunk['DATETIME'].to_numpy().astype(np.int64))
+        out = chunk.assign(TIME=times, DATE=dates)
+        out[output_columns(out)].to_csv(resampled_file, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        accumulators.append(trip_accumulators(chunk.assign(DATETIME_OBJ=chunk['DATETIME'])))
+        partials.append(statistics_partial(chunk))
+    if not partials:
+        return None, None
+    summary_stats, _ = finalize_statistics(merge_statistics(partials))
+    return finalize_trip_summary(merge_trip_accumulators(accumulators)), summary_stats
+
+
+def main():
+    from task2 import load_gps_data, print_summary_statistics
+    
+    print("="*80)
+    print("GPS TRAJECTORY RESAMPLING")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT CSV:  {CSV_FILE}")
+    print(f"  OUTPUT:     {resampled_path(CSV_FILE)}")
+    print(f"  Step: {STEP_SEC}s, gaps over {MAX_GAP_SEC}s left unfilled")
+    print()
+    
+    try:
+        df = load_gps_data(CSV_FILE, columns=INPUT_COLUMNS)
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {CSV_FILE}")
+        print("Please run Task 1 first!")
+        return
+    
+    resampled_file = resampled_path(CSV_FILE)
+    trip_summary, summary_stats = save_resampled(iter_resampled(df), resampled_file)
+    if trip_summary is None:
+        print("ERROR: No trip has two fixes within MAX_GAP_SEC")
+        return
+    summary_file = Path(CSV_FILE).parent / f'resampled_trip_summary_{STEP_SEC}s.csv'
+    trip_summary.to_csv(summary_file, index=False)
+    
+    print(f"✓ Resampled {len(df)} GPS points to {summary_stats['Total GPS Points']} "
+          f"points every {STEP_SEC}s in {len(trip_summary)} trips")
+    print(f"✓ Saved resampled trajectories to: {resampled_file}")
+    print(f"✓ Saved trip summary to: {summary_file}")
+    print()
+    print_summary_statistics(summary_stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+GPS Trip Segmentation and Stay-Point Detection
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from task1 import TABLE_DTYPES, TRIP_KEYS, calculate_trip_summary, compute_metrics, haversine_distance, to_compact
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
+OUTPUT_FOLDER = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results"
+
+# A gap longer than this between two points always ends a trip
+MAX_GAP_SEC = 300
+# A stay point is a dwell within this radius lasting at least MIN_STAY_SEC
+STAY_RADIUS_M = 200
+MIN_STAY_SEC = 1200
+
+# ============================================================================
+
+
+def _run_bounds(flags):
+    # Start and end index of each run of consecutive True values
+    padded = np.concatenate([[False], flags, [False]])
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    return changes[0::2], changes[1::2] - 1
+
+
+def _span_reduce(ufunc, values, first, last):
+    # ufunc over values[first[k]:last[k] + 1] for each k (spans must not overlap)
+    if len(first) == 0:
+        return np.zeros(0, dtype=values.dtype)
+    padded = np.append(values, values[-1])
+    bounds = np.column_stack([first, last + 1]).ravel()
+    return ufunc.reduceat(padded, bounds)[0::2]
+
+
+def _mark_spans(n, first, last, values):
+    # Array of length n with values[k] on first[k]..last[k] and -1 elsewhere
+    marks = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(marks, first, values + 1)
+    np.add.at(marks, last + 1, -(values + 1))
+    return np.cumsum(marks[:-1]) - 1
+
+
+def segment_trips(df, max_gap_sec=MAX_GAP_SEC, stay_radius_m=STAY_RADIUS_M, min_stay_sec=MIN_STAY_SEC):
+    # Splits logger trips on time gaps and stay points. Returns the refined
+    # trip points (TRIP_ID becomes "<trip>.<segment>", with SOURCE_TRIP_ID and
+    # recomputed metrics) and a table of stay points.
+    time_column = 'DATETIME_OBJ' if 'DATETIME_OBJ' in df.columns else 'DATETIME'
+    df = df.sort_values(TRIP_KEYS + [time_column], kind='stable').reset_index(drop=True)
+    n = len(df)
+    
+    lat = df['Y_COORDINA'].to_numpy(dtype=float)
+    lon = df['X_COORDINA'].to_numpy(dtype=float)
+    times = df[time_column].to_numpy()
+    group = df.groupby(TRIP_KEYS, sort=False, observed=True).ngroup().to_numpy()
+    
+    same_trip = np.zeros(n, dtype=bool)
+    same_trip[1:] = group[1:] == group[:-1]
+    step_km = np.zeros(n)
+    step_km[1:] = haversine_distance(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    step_sec = np.zeros(n)
+    step_sec[1:] = (times[1:] - times[:-1]) / np.timedelta64(1, 's')
+    
+    # Runs of points that did not move away from the previous point; a run
+    # starting at i covers the dwell from point i - 1 to the end of the run
+    still = same_trip & (step_km * 1000 <= stay_radius_m)
+    run_start, run_end = _run_bounds(still)
+    arrival, departure = run_start - 1, run_end
+    
+    duration = (times[departure] - times[arrival]) / np.timedelta64(1, 's')
+    extent_km = haversine_distance(
+        _span_reduce(np.minimum, lat, arrival, departure),
+        _span_reduce(np.minimum, lon, arrival, departure),
+        _span_reduce(np.maximum, lat, arrival, departure),
+        _span_reduce(np.maximum, lon, arrival, departure)
+    )
+    is_stay = (duration >= min_stay_sec) & (extent_km * 1000 <= 2 * stay_radius_m)
+    arrival, departure = arrival[is_stay], departure[is_stay]
+    
+    stay_id = _mark_spans(n, arrival, departure, np.arange(len(arrival)))
+    interior = _mark_spans(n, arrival + 1, departure - 1, np.zeros(len(arrival), dtype=np.int64)) >= 0
+    
+    new_segment = ~same_trip | (step_sec > max_gap_sec)
+    new_segment[interior] = False
+    new_segment[departure] = True
+    segment = np.cumsum(new_segment) - 1
+    
+    # Number each segment within its source trip for the refined TRIP_ID
+    segment_start = np.flatnonzero(new_segment)
+    trip_first_segment = segment[np.flatnonzero(~same_trip)]
+    segment_in_trip = np.arange(len(segment_start)) - trip_first_segment[group[segment_start]]
+    source_trips = df['TRIP_ID'].to_numpy()[segment_start]
+    labels = np.array([f"{trip}.{number + 1:03d}" for trip, number in zip(source_trips, segment_in_trip)],
+                      dtype=object)
+    
+    keep = ~interior
+    refined = df[keep].copy()
+    refined.insert(refined.columns.get_loc('TRIP_ID') + 1, 'SOURCE_TRIP_ID', refined['TRIP_ID'])
+    refined['TRIP_ID'] = labels[segment[keep]]
+    refined['STAY_ID'] = stay_id[keep]
+    refined['DATETIME_OBJ'] = times[keep]
+    
+    metrics = compute_metrics(
+        segment[keep],
+        lat[keep],
+        lon[keep],
+        times[keep],
+        refined['SPEED'].to_numpy(dtype=float)
+    )
+    for column, values in metrics.items():
+        refined[column] = values
+    refined = refined.reset_index(drop=True)
+    
+    stays = pd.DataFrame({
+        'STAY_ID': np.arange(len(arrival)),
+        'USER_ID': df['USER_ID'].to_numpy()[arrival],
+        'TRIP_ID': df['TRIP_ID'].to_numpy()[arrival],
+        'Y_COORDINA': _span_reduce(np.add, lat, arrival, departure) / (departure - arrival + 1),
+        'X_COORDINA': _span_reduce(np.add, lon, arrival, departure) / (departure - arrival + 1),
+        'ARRIVAL_TIME': times[arrival],
+        'DEPARTURE_TIME': times[departure],
+        'DURATION_MIN': ((times[departure] - times[arrival]) / np.timedelta64(1, 's') / 60).round(2),
+        'NUM_POINTS': departure - arrival + 1
+    })
+    
+    return refined, stays
+
+
+def segment_point_table(points, max_gap_sec=MAX_GAP_SEC, stay_radius_m=STAY_RADIUS_M,
+                        min_stay_sec=MIN_STAY_SEC):
+    # The segmentation stage of task1 and the pipeline: segment_trips on a
+    # task1.point_table, returning the refined points in the same layout
+    # (IDs renumbered from 1) and the stay points
+    refined, stays = segment_trips(points, max_gap_sec, stay_radius_m, min_stay_sec)
+    refined['ID'] = np.arange(1, len(refined) + 1)
+    return to_compact(refined, TABLE_DTYPES), stays
+
+
+def segment_gps_data(csv_file, output_folder=None):
+    from task2 import load_gps_data
+    
+    print("Loading GPS data...")
+    try:
+        df = load_gps_data(csv_file)
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {csv_file}")
+        print("Please run Task 1 first!")
+        return None, None
+    print(f"✓ Loaded {len(df)} GPS points")
+    
+    output_folder = Path(csv_file).parent if output_folder is None else Path(output_folder)
+    output_folder.mkdir(exist_ok=True, parents=True)
+    
+    refined, stays = segment_trips(df)
+    refined_summary = calculate_trip_summary(refined)
+    
+    summary_file = output_folder / 'refined_trip_summary.csv'
+    refined_summary.to_csv(summary_file, index=False)
+    print(f"✓ Saved refined trip summary to: {summary_file}")
+    print(f"  Trips: {df.groupby(TRIP_KEYS, observed=True).ngroups} logger trips -> {len(refined_summary)} refined trips")
+    
+    stays_file = output_folder / 'stay_points.csv'
+    stays.to_csv(stays_file, index=False)
+    print(f"✓ Saved stay points to: {stays_file}")
+    print(f"  Stay points: {len(stays)}")
+    
+    return refined_summary, stays
+
+
+def main():
+    print("="*80)
+    print("GPS TRIP SEGMENTATION")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT CSV:  {CSV_FILE}")
+    print(f"  OUTPUT:     {OUTPUT_FOLDER}")
+    print(f"  Gap split: {MAX_GAP_SEC}s, stay radius: {STAY_RADIUS_M}m, min stay: {MIN_STAY_SEC}s")
+    print()
+    
+    segment_gps_data(CSV_FILE, OUTPUT_FOLDER)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+GPS Trajectory Simplification
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from task1 import TRIP_KEYS, read_compact_csv, to_compact
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
+
+# Largest distance (meters) between a dropped point and the simplified line
+TOLERANCE_M = 10
+# Measure the error against the position interpolated at the point's
+# timestamp (synchronized Euclidean distance) instead of the nearest point
+# on the line, so the kept points also preserve the timing of each trip
+TIME_AWARE = False
+
+# ============================================================================
+
+SIMPLIFIED_FILE_NAME = 'gps_simplified_trajectories.csv'
+REPORT_FILE_NAME = 'simplification_report.csv'
+
+EARTH_RADIUS_M = 6371000
+POINT_COLUMNS = ['ID', 'TRIP_ID', 'USER_ID', 'Y_COORDINA', 'X_COORDINA', 'DATETIME', 'SPEED', 'HEIGHT']
+
+
+def simplified_path(csv_file):
+    return Path(csv_file).parent / SIMPLIFIED_FILE_NAME
+
+
+def _line_errors(x, y, sec, pos, first, last, time_aware):
+    # Distance from each point pos to the line first -> last of its span
+    ax, ay = x[first], y[first]
+    dx, dy = x[last] - ax, y[last] - ay
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if time_aware:
+            span = sec[last] - sec[first]
+            f = np.where(span > 0, (sec[pos] - sec[first]) / span, 0)
+        else:
+            length2 = dx * dx + dy * dy
+            f = np.where(length2 > 0, ((x[pos] - ax) * dx + (y[pos] - ay) * dy) / length2, 0)
+    f = np.clip(f, 0, 1)
+    return np.hypot(x[pos] - (ax + f * dx), y[pos] - (ay + f * dy))
+
+
+def simplify_trips(df, tolerance_m=TOLERANCE_M, time_aware=TIME_AWARE):
+    # Douglas-Peucker on every trip at once: each pass finds the farthest
+    # point of every open span and splits the spans farther than tolerance_m.
+    # Returns the kept points (trip and time order) and a per-trip report.
+    time_column = 'DATETIME_OBJ' if 'DATETIME_OBJ' in df.columns else 'DATETIME'
+    df = df.sort_values(TRIP_KEYS + [time_column], kind='stable').reset_index(drop=True)
+    n = len(df)
+    
+    lat = df['Y_COORDINA'].to_numpy(dtype=float)
+    lon = df['X_COORDINA'].to_numpy(dtype=float)
+    times = df[time_column].to_numpy()
+    group = df.groupby(TRIP_KEYS, sort=False, observed=True).ngroup().to_numpy()
+    
+    starts = np.flatnonzero(np.diff(group, prepend=-1) != 0)
+    ends = np.append(starts[1:], n) - 1
+    
+    # Local metric projection around each trip's first point
+    cos_ref = np.cos(np.radians(lat[starts]))[group]
+    x = np.radians(lon) * cos_ref * EARTH_RADIUS_M
+    y = np.radians(lat) * EARTH_RADIUS_M
+    sec = (times - times.min()) / np.timedelta64(1, 's') if n else np.zeros(0)
+    
+    keep = np.zeros(n, dtype=bool)
+    keep[starts] = True
+    keep[ends] = True
+    first, last = starts, ends
+    while True:
+        open_spans = last - first > 1
+        first, last = first[open_spans], last[open_spans]
+        if len(first) == 0:
+            break
+        
+        sizes = last - first - 1
+        offsets = np.cumsum(sizes) - sizes
+        span = np.repeat(np.arange(len(first)), sizes)
+        pos = first[span] + 1 + np.arange(sizes.sum()) - offsets[span]
+        errors = _line_errors(x, y, sec, pos, first[span], last[span], time_aware)
+        
+        max_error = np.maximum.reduceat(errors, offsets)
+        at_max = errors == max_error[span]
+        _, first_max = np.unique(span[at_max], return_index=True)
+        split = pos[at_max][first_max]
+        
+        far = max_error > tolerance_m
+        keep[split[far]] = True
+        first, last = np.concatenate([first[far], split[far]]), np.concatenate([split[far], last[far]])
+    
+    simplified = to_compact(df[keep])
+    simplified = simplified[[c for c in POINT_COLUMNS if c in simplified.columns]].reset_index(drop=True)
+    
+    counts = pd.DataFrame({'NUM_POINTS': 1, 'NUM_KEPT': keep}, index=df.index)
+    report = counts.groupby([df[key] for key in TRIP_KEYS], sort=False, observed=True).sum().reset_index()
+    report['COMPRESSION_RATIO'] = (report['NUM_POINTS'] / report['NUM_KEPT']).round(2)
+    
+    return simplified, report
+
+
+def save_simplified_trajectories(simplified, simplified_file):
+    # Same DATE/TIME layout as gps_processed_data.csv, so read_compact_csv loads it
+    out = simplified.drop(columns=['DATETIME'])
+    position = simplified.columns.get_loc('DATETIME')
+    out.insert(position, 'DATE', simplified['DATETIME'].dt.strftime('%Y-%m-%d'))
+    out.insert(position + 1, 'TIME', simplified['DATETIME'].dt.strftime('%H:%M:%S'))
+    Path(simplified_file).parent.mkdir(exist_ok=True, parents=True)
+    out.to_csv(simplified_file, index=False)
+
+
+def load_simplified_trajectories(simplified_file):
+    return read_compact_csv(simplified_file)
+
+
+def main():
+    from task2 import load_gps_data
+    
+    print("="*80)
+    print("GPS TRAJECTORY SIMPLIFICATION")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT CSV:  {CSV_FILE}")
+    print(f"  OUTPUT:     {simplified_path(CSV_FILE)}")
+    print(f"  Tolerance: {TOLERANCE_M}m ({'time-aware' if TIME_AWARE else 'Douglas-Peucker'})")
+    print()
+    
+    try:
+        df = load_gps_data(CSV_FILE, columns=POINT_COLUMNS)
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {CSV_FILE}")
+        print("Please run Task 1 first!")
+        return
+    
+    simplified, report = simplify_trips(df)
+    save_simplified_trajectories(simplified, simplified_path(CSV_FILE))
+    report_file = Path(CSV_FILE).parent / REPORT_FILE_NAME
+    report.to_csv(report_file, index=False)
+    
+    print(f"✓ Simplified {len(report)} trips: {len(df)} -> {len(simplified)} GPS points")
+    print(f"  Compression ratio: {len(df) / max(len(simplified), 1):.2f}x "
+          f"(per trip median {report['COMPRESSION_RATIO'].median():.2f}x)")
+    print(f"✓ Saved simplified trajectories to: {simplified_path(CSV_FILE)}")
+    print(f"✓ Saved compression report to: {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+GPS Spatial Grid Index
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import time
+from task1 import haversine_distance
+from task2 import load_gps_data
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
+INDEX_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_spatial_index.npz"
+
+# Grid cell size in degrees (0.01 is roughly 1 km)
+CELL_DEG = 0.01
+
+# ============================================================================
+
+KM_PER_DEGREE = 6371 * np.pi / 180
+
+
+def build_grid_index(df, cell_deg=CELL_DEG):
+    # Points are sorted by grid cell; `starts` holds the offset of each
+    # non-empty cell in `cells`, so any run of cells in one grid row maps to
+    # one contiguous slice of points
+    lat = df['Y_COORDINA'].to_numpy(dtype=float)
+    lon = df['X_COORDINA'].to_numpy(dtype=float)
+    ids = df['ID'].to_numpy() if 'ID' in df.columns else np.arange(1, len(df) + 1)
+    
+    lat0, lon0 = lat.min(), lon.min()
+    ny = int((lat.max() - lat0) // cell_deg) + 1
+    nx = int((lon.max() - lon0) // cell_deg) + 1
+    keys = ((lat - lat0) // cell_deg).astype(np.int64) * nx + ((lon - lon0) // cell_deg).astype(np.int64)
+    
+    order = np.argsort(keys, kind='stable')
+    cells, starts = np.unique(keys[order], return_index=True)
+    user_codes, users = pd.factorize(df['USER_ID'])
+    
+    return {
+        'cell_deg': np.float64(cell_deg),
+        'origin': np.array([lat0, lon0]),
+        'shape': np.array([ny, nx]),
+        'cells': cells,
+        'starts': np.append(starts, len(order)),
+        'lat': lat[order],
+        'lon': lon[order],
+        'ids': ids[order],
+        'user_codes': user_codes[order],
+        'users': np.asarray(users, dtype=str),
+        'trip_ids': np.asarray(df['TRIP_ID']).astype(str)[order]
+    }
+
+
+def save_grid_index(index, index_file):
+    Path(index_file).parent.mkdir(exist_ok=True, parents=True)
+    np.savez(index_file, **index)
+
+
+def load_grid_index(index_file):
+    with np.load(index_file) as data:
+        return {key: data[key] for key in data.files}
+
+
+def _candidates(index, min_lat, min_lon, max_lat, max_lon):
+    # Positions of the points in every cell overlapping the box
+    cell_deg = float(index['cell_deg'])
+    lat0, lon0 = index['origin']
+    ny, nx = index['shape']
+    
+    y0 = max(int((min_lat - lat0) // cell_deg), 0)
+    y1 = min(int((max_lat - lat0) // cell_deg), ny - 1)
+    x0 = max(int((min_lon - lon0) // cell_deg), 0)
+    x1 = min(int((max_lon - lon0) // cell_deg), nx - 1)
+    if y0 > y1 or x0 > x1:
+        return np.zeros(0, dtype=np.int64)
+    
+    rows = np.arange(y0, y1 + 1) * nx
+    first = index['starts'][np.searchsorted(index['cells'], rows + x0, side='left')]
+    last = index['starts'][np.searchsorted(index['cells'], rows + x1, side='right')]
+    spans = [np.arange(a, b) for a, b in zip(first, last) if b > a]
+    return np.concatenate(spans) if spans else np.zeros(0, dtype=np.int64)
+
+
+def query_bbox(index, min_lat, min_lon, max_lat, max_lon):
+    pos = _candidates(index, min_lat, min_lon, max_lat, max_lon)
+    lat, lon = index['lat'][pos], index['lon'][pos]
+    inside = (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+    return index['ids'][pos[inside]]
+
+
+def _radius_positions(index, lat, lon, radius_km):
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = dlat / max(np.cos(np.radians(lat)), 1e-6)
+    pos = _candidates(index, lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+    dist = haversine_distance(lat, lon, index['lat'][pos], index['lon'][pos])
+    inside = dist <= radius_km
+    pos, dist = pos[inside], dist[inside]
+    order = np.argsort(dist, kind='stable')
+    return pos[order], dist[order]
+
+
+def query_radius(index, lat, lon, radius_km):
+    # IDs of points within radius_km of (lat, lon), nearest first, with distances
+    pos, dist = _radius_positions(index, lat, lon, radius_km)
+    return index['ids'][pos], dist
+
+
+def query_nearest(index, lat, lon, k=1):
+    # Grows a radius search until it holds k points; any point outside the
+    # radius is farther than every point inside it, so the result is exact
+    cell_km = float(index['cell_deg']) * KM_PER_DEGREE
+    max_km = np.pi * 6371
+    radius_km = cell_km
+    while True:
+        pos, dist = _radius_positions(index, lat, lon, radius_km)
+        if len(pos) >= k or radius_km >= max_km:
+            return index['ids'][pos[:k]], dist[:k]
+        radius_km *= 2
+
+
+def trips_in_bbox(index, min_lat, min_lon, max_lat, max_lon):
+    pos = _candidates(index, min_lat, min_lon, max_lat, max_lon)
+    lat, lon = index['lat'][pos], index['lon'][pos]
+    pos = pos[(lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)]
+    trips = pd.DataFrame({
+        'USER_ID': index['users'][index['user_codes'][pos]],
+        'TRIP_ID': index['trip_ids'][pos]
+    })
+    return trips.drop_duplicates().sort_values(['USER_ID', 'TRIP_ID']).reset_index(drop=True)
+
+
+def main():
+    print("="*80)
+    print("GPS SPATIAL GRID INDEX")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT CSV:  {CSV_FILE}")
+    print(f"  INDEX:      {INDEX_FILE}")
+    print()
+    
+    try:
+        df = load_gps_data(CSV_FILE, columns=['ID', 'TRIP_ID', 'USER_ID', 'Y_COORDINA', 'X_COORDINA'])
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {CSV_FILE}")
+        print("Please run Task 1 first!")
+        return
+    
+    index = build_grid_index(df)
+    save_grid_index(index, INDEX_FILE)
+    print(f"✓ Indexed {len(df)} GPS points into {len(index['cells'])} cells of {CELL_DEG}°")
+    print(f"✓ Saved index to: {INDEX_FILE}")
+    
+    lat, lon = df['Y_COORDINA'].median(), df['X_COORDINA'].median()
+    start = time.perf_counter()
+    ids, _ = query_radius(index, lat, lon, 1.0)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"  Radius query (1 km around {lat:.4f}, {lon:.4f}): {len(ids)} points in {elapsed:.2f} ms")
+    start = time.perf_counter()
+    ids, dist = query_nearest(index, lat, lon, k=10)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"  10 nearest points: up to {dist.max():.3f} km away, found in {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
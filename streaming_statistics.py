@@ -0,0 +1,230 @@
+"""
+GPS Summary Statistics in Bounded Memory
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+import os
+from task1 import CSV_DTYPES, to_compact
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
+
+# Rows read at a time; memory use is bounded by this, not by the data set
+CHUNK_ROWS = 1000000
+# Worker processes, each summarizing a share of the USER_ID partitions of the
+# Parquet store (the CSV is always read in one pass)
+WORKERS = 1
+
+# Fixed bin widths, so histograms of different chunks can be added up
+SPEED_BIN_KMH = 1.0
+ACCELERATION_BIN = 0.1
+
+# ============================================================================
+
+STATISTIC_COLUMNS = ['TRIP_ID', 'USER_ID', 'DATETIME', 'SPEED', 'DISTANCE_KM', 'ACCELERATION']
+HISTOGRAM_FILE_NAME = 'summary_histograms.csv'
+
+# Exponent groups are summed with float weights, which stay exact below 2**53
+_EXACT_ROWS = 1 << 20
+
+
+def exact_sum_parts(values):
+    # Sum of the finite values as {binary exponent: integer sum of mantissas};
+    # being exact, partial sums merge to the same total in any order
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    parts = {}
+    for start in range(0, len(values), _EXACT_ROWS):
+        mantissa, exponent = np.frexp(values[start:start + _EXACT_ROWS])
+        mantissa = (mantissa * 2.0**53).astype(np.int64)
+        exponents, index = np.unique(exponent, return_inverse=True)
+        high = np.bincount(index, weights=mantissa >> 32)
+        low = np.bincount(index, weights=mantissa & 0xFFFFFFFF)
+        for e, h, l in zip(exponents.tolist(), high.tolist(), low.tolist()):
+            parts[e - 53] = parts.get(e - 53, 0) + int(h) * 2**32 + int(l)
+    return parts
+
+
+def merge_sum_parts(parts_list):
+    merged = {}
+    for parts in parts_list:
+        for exponent, mantissa in parts.items():
+            merged[exponent] = merged.get(exponent, 0) + mantissa
+    return merged
+
+
+def exact_value(parts):
+    return sum((Fraction(mantissa) * Fraction(2)**exponent for exponent, mantissa in parts.items()), Fraction(0))
+
+
+def _bin_counts(values, width):
+    values = np.asarray(values, dtype=float)
+    bins = np.floor(values[np.isfinite(values)] / width).astype(np.int64)
+    edges, counts = np.unique(bins, return_counts=True)
+    return pd.Series(counts, index=edges)
+
+
+def statistics_partial(df):
+    # Mergeable aggregates of one chunk of the point table (compact schema)
+    speed = df['SPEED'].to_numpy(dtype=float, na_value=np.nan)
+    distance = df['DISTANCE_KM'].to_numpy(dtype=float, na_value=np.nan)
+    datetimes = df['DATETIME']
+    return {
+        'points': len(df),
+        'trips': set(df['TRIP_ID'].dropna().unique().tolist()),
+        'users': set(df['USER_ID'].dropna().unique().tolist()),
+        'distance_sum': exact_sum_parts(distance),
+        'distance_count': int(np.isfinite(distance).sum()),
+        'speed_sum': exact_sum_parts(speed),
+        'speed_count': int(np.isfinite(speed).sum()),
+        'speed_max': float(np.nanmax(speed)) if np.isfinite(speed).any() else np.nan,
+        'speed_min': float(np.nanmin(speed)) if np.isfinite(speed).any() else np.nan,
+        'start': datetimes.min(),
+        'end': datetimes.max(),
+        'hourly': np.bincount(datetimes.dt.hour.dropna().astype(int), minlength=24),
+        'weekday': np.bincount(datetimes.dt.dayofweek.dropna().astype(int), minlength=7),
+        'speed_bins': _bin_counts(speed, SPEED_BIN_KMH),
+        'acceleration_bins': _bin_counts(df['ACCELERATION'].to_numpy(dtype=float, na_value=np.nan),
+                                         ACCELERATION_BIN)
+    }
+
+
+def merge_statistics(partials):
+    partials = list(partials)
+    return {
+        'points': sum(p['points'] for p in partials),
+        'trips': set().union(*(p['trips'] for p in partials)),
+        'users': set().union(*(p['users'] for p in partials)),
+        'distance_sum': merge_sum_parts(p['distance_sum'] for p in partials),
+        'distance_count': sum(p['distance_count'] for p in partials),
+        'speed_sum': merge_sum_parts(p['speed_sum'] for p in partials),
+        'speed_count': sum(p['speed_count'] for p in partials),
+        'speed_max': max((p['speed_max'] for p in partials if not np.isnan(p['speed_max'])), default=np.nan),
+        'speed_min': min((p['speed_min'] for p in partials if not np.isnan(p['speed_min'])), default=np.nan),
+        'start': min((p['start'] for p in partials if not pd.isna(p['start'])), default=pd.NaT),
+        'end': max((p['end'] for p in partials if not pd.isna(p['end'])), default=pd.NaT),
+        'hourly': sum(p['hourly'] for p in partials),
+        'weekday': sum(p['weekday'] for p in partials),
+        'speed_bins': pd.concat([p['speed_bins'] for p in partials]).groupby(level=0).sum(),
+        'acceleration_bins': pd.concat([p['acceleration_bins'] for p in partials]).groupby(level=0).sum()
+    }
+
+
+def finalize_statistics(partial):
+    # The summary_statistics.txt values and the histograms (hour of day,
+    # day of week, speed and acceleration bins) of the merged aggregates
+    def mean(parts, count):
+        return float(exact_value(parts) / count) if count else np.nan
+    
+    summary_stats = {
+        'Total GPS Points': partial['points'],
+        'Total Trips': len(partial['trips']),
+        'Total Users': len(partial['users']),
+        'Total Distance (km)': float(exact_value(partial['distance_sum'])),
+        'Average Speed (km/h)': mean(partial['speed_sum'], partial['speed_count']),
+        'Max Speed (km/h)': partial['speed_max'],
+        'Min Speed (km/h)': partial['speed_min'],
+        'Average Distance (km)': mean(partial['distance_sum'], partial['distance_count']),
+        'Date Range': f"{partial['start']:%Y-%m-%d} to {partial['end']:%Y-%m-%d}"
+    }
+    
+    def binned(counts, width):
+        return pd.DataFrame({'BIN_START': counts.index * width, 'BIN_END': (counts.index + 1) * width,
+                             'COUNT': counts.to_numpy()})
+    
+    histograms = {
+        'hour': pd.DataFrame({'BIN_START': range(24), 'BIN_END': range(1, 25), 'COUNT': partial['hourly']}),
+        'weekday': pd.DataFrame({'BIN_START': range(7), 'BIN_END': range(1, 8), 'COUNT': partial['weekday']}),
+        'speed': binned(partial['speed_bins'], SPEED_BIN_KMH),
+        'acceleration': binned(partial['acceleration_bins'], ACCELERATION_BIN)
+    }
+    return summary_stats, histograms
+
+
+def iter_csv_chunks(csv_file, chunk_rows=CHUNK_ROWS, columns=STATISTIC_COLUMNS):
+    # gps_processed_data.csv in chunks of the compact schema
+    usecols = [c for c in columns if c != 'DATETIME'] + ['DATE', 'TIME']
+    dtypes = {column: CSV_DTYPES[column] for column in usecols if column in CSV_DTYPES}
+    for chunk in pd.read_csv(csv_file, usecols=usecols, dtype=dtypes, chunksize=chunk_rows):
+        yield to_compact(chunk)
+
+
+def _parquet_partial(parquet_dir, users, chunk_rows=CHUNK_ROWS, columns=STATISTIC_COLUMNS):
+    import pyarrow.dataset as ds
+    dataset = ds.dataset(parquet_dir, partitioning='hive')
+    batches = dataset.to_batches(columns=columns, filter=ds.field('USER_ID').isin(users),
+                                 batch_size=chunk_rows)
+    return merge_statistics(statistics_partial(to_compact(batch.to_pandas())) for batch in batches)
+
+
+def _parquet_statistics(parquet_dir, chunk_rows, workers):
+    users = sorted(path.name.split('=', 1)[1] for path in Path(parquet_dir).glob('USER_ID=*'))
+    if workers is None:
+        workers = os.cpu_count()
+    shares = [users[i::workers] for i in range(min(workers, len(users)))]
+    if len(shares) <= 1:
+        return _parquet_partial(parquet_dir, users, chunk_rows)
+    with ProcessPoolExecutor(max_workers=len(shares)) as executor:
+        partials = list(executor.map(_parquet_partial, [parquet_dir] * len(shares), shares,
+                                     [chunk_rows] * len(shares)))
+    return merge_statistics(partials)
+
+
+def chunked_statistics(csv_file, chunk_rows=CHUNK_ROWS, workers=WORKERS):
+    # Same results as task2.summary_statistics on the whole table, reading at
+    # most chunk_rows rows at a time (from the Parquet store when it exists)
+    parquet_dir = Path(csv_file).with_suffix('.parquet')
+    if parquet_dir.exists():
+        try:
+            return finalize_statistics(_parquet_statistics(parquet_dir, chunk_rows, workers))
+        except ImportError:
+            pass
+    return finalize_statistics(merge_statistics(
+        statistics_partial(chunk) for chunk in iter_csv_chunks(csv_file, chunk_rows)))
+
+
+def save_histograms(histograms, histogram_file):
+    frames = [table.assign(HISTOGRAM=name) for name, table in histograms.items()]
+    table = pd.concat(frames, ignore_index=True)
+    table[['HISTOGRAM', 'BIN_START', 'BIN_END', 'COUNT']].to_csv(histogram_file, index=False)
+
+
+def main():
+    from task2 import print_summary_statistics, save_summary_statistics
+    
+    print("="*80)
+    print("GPS SUMMARY STATISTICS (CHUNKED)")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT CSV:  {CSV_FILE}")
+    print(f"  Chunk size: {CHUNK_ROWS} rows, {WORKERS} worker(s)")
+    print()
+    
+    if not Path(CSV_FILE).exists() and not Path(CSV_FILE).with_suffix('.parquet').exists():
+        print(f"ERROR: File not found: {CSV_FILE}")
+        print("Please run Task 1 first!")
+        return
+    
+    summary_stats, histograms = chunked_statistics(CSV_FILE)
+    summary_file = Path(CSV_FILE).parent / 'summary_statistics.txt'
+    save_summary_statistics(summary_stats, summary_file)
+    histogram_file = Path(CSV_FILE).parent / HISTOGRAM_FILE_NAME
+    save_histograms(histograms, histogram_file)
+    print(f"✓ Saved: {summary_file}")
+    print(f"✓ Saved: {histogram_file}")
+    print()
+    print_summary_statistics(summary_stats)
+
+
+if __name__ == "__main__":
+    main()
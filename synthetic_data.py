@@ -0,0 +1,142 @@
+"""
+Synthetic GPS Logger Data (.gsd)
+Course: AMI23K - Lab 2
+"""
+
+import numpy as np
+from pathlib import Path
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+OUTPUT_FOLDER = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\synthetic"
+
+# The defaults roughly match the size of the real data set (~16k points)
+USERS = 20
+TRIPS_PER_USER = 18
+# Average points per trip (each trip gets between 1 and twice this many)
+POINTS_PER_TRIP = 45
+# Standard deviation of the position noise added to every fix, in meters
+NOISE_M = 5
+# Share of points logged without an altitude (written as -1)
+MISSING_HEIGHT = 0.1
+SEED = 0
+
+# ============================================================================
+
+START_LAT, START_LON = 60.6, 15.6
+KM_PER_DEGREE = 6371 * np.pi / 180
+FIRST_DAY = np.datetime64('2011-06-01', 's')
+DAYS = 91
+
+
+def _degree_minutes(values):
+    # Decimal degrees to the logger's DDMM.mmm * 1000 integers
+    degrees = np.floor(values)
+    return (degrees * 100000 + np.round((values - degrees) * 60 * 1000)).astype(np.int64)
+
+
+def generate_trips(rng, trips, points, noise_m=NOISE_M, missing_height=MISSING_HEIGHT):
+    # Random-walk trips with smooth speed and heading; returns the trip start
+    # times and a dict of point arrays in the raw .gsd units
+    sizes = rng.integers(1, 2 * points, size=trips)
+    n = int(sizes.sum())
+    trip = np.repeat(np.arange(trips), sizes)
+    first = np.cumsum(sizes) - sizes
+    is_first = np.zeros(n, dtype=bool)
+    is_first[first] = True
+    
+    start = (FIRST_DAY + rng.integers(0, DAYS, size=trips) * 86400
+             + rng.integers(6 * 3600, 20 * 3600, size=trips))
+    step_sec = np.where(is_first, 0, rng.choice([1, 5, 30, 30, 30, 30], size=n))
+    seconds = np.cumsum(step_sec)
+    times = start[trip] + (seconds - seconds[first][trip]).astype('timedelta64[s]')
+    
+    # Speed and heading drift per point, restarting at every trip
+    speed_walk = np.cumsum(rng.normal(0, 3, size=n))
+    heading_walk = np.cumsum(rng.normal(0, 0.2, size=n))
+    speed = np.clip(40 + speed_walk - speed_walk[first][trip], 0, 130)
+    heading = rng.uniform(0, 2 * np.pi, size=trips)[trip] + heading_walk - heading_walk[first][trip]
+    step_km = np.where(is_first, 0, speed * step_sec / 3600)
+    dy = step_km * np.cos(heading) / KM_PER_DEGREE
+    dx = step_km * np.sin(heading) / KM_PER_DEGREE / np.cos(np.radians(START_LAT))
+    origin_lat = START_LAT + rng.normal(0, 0.2, size=trips)
+    origin_lon = START_LON + rng.normal(0, 0.4, size=trips)
+    lat = np.cumsum(dy)
+    lon = np.cumsum(dx)
+    lat = origin_lat[trip] + lat - lat[first][trip]
+    lon = origin_lon[trip] + lon - lon[first][trip]
+    lat += rng.normal(0, noise_m / 1000 / KM_PER_DEGREE, size=n)
+    lon += rng.normal(0, noise_m / 1000 / KM_PER_DEGREE / np.cos(np.radians(START_LAT)), size=n)
+    
+    day = times.astype('datetime64[D]')
+    clock = (times - day).astype(np.int64)
+    year, month = day.astype('datetime64[Y]'), day.astype('datetime64[M]')
+    dates = ((day - month).astype(np.int64) + 1) * 10000 + (
+        (month - year).astype(np.int64) + 1) * 100 + (year.astype(np.int64) + 1970) % 100
+    
+    height = rng.integers(0, 300, size=n)
+    height[rng.random(n) < missing_height] = -1
+    
+    return start, {
+        'TRIP': trip,
+        'POINT': np.arange(n) - first[trip] + 1,
+        'LAT': _degree_minutes(lat),
+        'LON': _degree_minutes(lon),
+        'TIME': clock // 3600 * 10000 + clock // 60 % 60 * 100 + clock % 60,
+        'DATE': dates,
+        'SPEED': np.round(speed * 100).astype(np.int64),
+        'HEIGHT': height
+    }
+
+
+def write_gsd_file(file_path, start, points):
+    # [trip,YYYY-MM-DD:HH:MM:SS] headers followed by id=lat,lon,time,date,speed,alt lines
+    bounds = np.flatnonzero(np.diff(points['TRIP'], prepend=-1))
+    bounds = np.append(bounds, len(points['TRIP']))
+    columns = [points[key].tolist() for key in ['POINT', 'LAT', 'LON', 'TIME', 'DATE', 'SPEED', 'HEIGHT']]
+    rows = list(zip(*columns))
+    headers = np.datetime_as_string(start).tolist()
+    
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            trip = points['TRIP'][a]
+            f.write(f"[{trip + 1:03d},{headers[trip].replace('T', ':')}]\n")
+            f.write(''.join(map('%d=%d,%d,%06d,%06d,%d,%d\n'.__mod__, rows[a:b])))
+
+
+def generate_gsd_files(output_folder, users=USERS, trips=TRIPS_PER_USER, points=POINTS_PER_TRIP,
+                       noise_m=NOISE_M, missing_height=MISSING_HEIGHT, seed=SEED):
+    # One <user>.gsd file per user; returns the file paths and total point count
+    rng = np.random.default_rng(seed)
+    output_path = Path(output_folder)
+    output_path.mkdir(exist_ok=True, parents=True)
+    
+    gsd_files, total = [], 0
+    for user in range(users):
+        start, points_data = generate_trips(rng, trips, points, noise_m, missing_height)
+        gsd_file = output_path / f'user{user + 1:03d}.gsd'
+        write_gsd_file(gsd_file, start, points_data)
+        gsd_files.append(gsd_file)
+        total += len(points_data['TRIP'])
+    return gsd_files, total
+
+
+def main():
+    print("="*80)
+    print("SYNTHETIC GPS DATA")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  OUTPUT:     {OUTPUT_FOLDER}")
+    print(f"  {USERS} users x {TRIPS_PER_USER} trips x ~{POINTS_PER_TRIP} points, noise {NOISE_M}m")
+    print()
+    
+    gsd_files, total = generate_gsd_files(OUTPUT_FOLDER)
+    print(f"✓ Wrote {total} GPS points to {len(gsd_files)} .gsd files in: {OUTPUT_FOLDER}")
+
+
+if __name__ == "__main__":
+    main()
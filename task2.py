@@ -7,7 +7,15 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+from matplotlib.collections import LineCollection
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import os
+from task1 import TRIP_KEYS, read_compact_csv, to_compact
+from density_tiles import load_density_tiles, tile_cells, tiles_path
+from simplification import load_simplified_trajectories, simplified_path
+from streaming_statistics import finalize_statistics, statistics_partial
+from instrumentation import finish_run, print_run_report, save_run_report, stage, start_run
 
 # ============================================================================
 # CONFIGURATION
@@ -16,74 +24,119 @@ from pathlib import Path
 CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
 OUTPUT_FOLDER = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\figures"
 
+# Figure resolution and file formats (e.g. ['png', 'pdf'])
+FIGURE_DPI = 300
+FIGURE_FORMATS = ['png']
+# Worker processes for rendering figures (1 = no pool, None = all cores)
+FIGURE_WORKERS = 1
+# Extra figure sets per group, e.g. ['USER_ID', 'DATE'] (one sub-folder each)
+FIGURE_SETS = []
+# Batch mode: non-interactive backend and no "Press Enter" prompts
+HEADLESS = False
+# Write run_report_task2.json (time and peak RSS per figure) next to the CSV
+RUN_REPORT = True
+
 # ============================================================================
 
+if HEADLESS:
+    plt.switch_backend('Agg')
 
-def visualize_gps_data(csv_file, output_folder=None):
-    print("Loading GPS data...")
-    try:
-        df = pd.read_csv(csv_file)
-    except FileNotFoundError:
-        print(f"ERROR: File not found: {csv_file}")
-        print("Please run Task 1 first!")
-        return None
-    
-    print(f"✓ Loaded {len(df)} GPS points")
-    print(f"  - Trips: {df['TRIP_ID'].nunique()}")
-    print(f"  - Users: {df['USER_ID'].nunique()}")
-    print()
-    
-    if output_folder is None:
-        output_folder = Path(csv_file).parent / 'figures'
-    else:
-        output_folder = Path(output_folder)
-    
-    output_folder.mkdir(exist_ok=True, parents=True)
+
+def columnar_path(csv_file):
+    return Path(csv_file).with_suffix('.parquet')
+
+
+def load_gps_data(csv_file, columns=None, users=None):
+    # Reads the partitioned Parquet store written next to the CSV when it
+    # exists, loading only the requested columns and USER_ID partitions.
+    # Either way the result uses the compact schema from task1.COMPACT_DTYPES.
+    parquet_dir = columnar_path(csv_file)
+    if parquet_dir.exists():
+        filters = [('USER_ID', 'in', list(users))] if users is not None else None
+        try:
+            df = pd.read_parquet(parquet_dir, columns=columns, filters=filters)
+        except ImportError:
+            pass
+        else:
+            if 'ID' in df.columns:
+                df = df.sort_values('ID', ignore_index=True)
+            return to_compact(df)
     
-    # 1. LONGITUDE VS LATITUDE
-    print("1. Creating longitude vs latitude plot...")
-    plt.figure(figsize=(14, 10))
+    usecols = None
+    if columns is not None:
+        usecols = [c for c in columns if c != 'DATETIME']
+        if 'DATETIME' in columns:
+            usecols += ['DATE', 'TIME']
+        if users is not None and 'USER_ID' not in usecols:
+            usecols.append('USER_ID')
+    df = read_compact_csv(csv_file, usecols=usecols)
+    if users is not None:
+        df = df[df['USER_ID'].isin(list(users))].reset_index(drop=True)
+    return df
+
+
+def _save_figure(fig, output_folder, name, dpi, formats):
+    fig.tight_layout()
+    fig_files = []
+    for fmt in formats:
+        fig_file = Path(output_folder) / f'{name}.{fmt}'
+        fig.savefig(fig_file, dpi=dpi, bbox_inches='tight')
+        fig_files.append(fig_file)
+    plt.close(fig)
+    return fig_files
+
+
+def plot_longitude_latitude(df, output_folder, dpi=FIGURE_DPI, formats=FIGURE_FORMATS):
+    fig = plt.figure(figsize=(14, 10))
     scatter = plt.scatter(df['X_COORDINA'], df['Y_COORDINA'], 
                          c=df['SPEED'], cmap='viridis', 
-                         alpha=0.6, s=10, edgecolors='none')
+                         alpha=0.6, s=10, edgecolors='none', rasterized=True)
     plt.colorbar(scatter, label='Speed (km/h)')
     plt.xlabel('Longitude', fontsize=12)
     plt.ylabel('Latitude', fontsize=12)
     plt.title('GPS Data Points - Longitude vs Latitude', fontsize=14, fontweight='bold')
     plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    fig_file = output_folder / 'longitude_vs_latitude.png'
-    plt.savefig(fig_file, dpi=300, bbox_inches='tight')
-    print(f"   ✓ Saved: {fig_file}")
-    plt.close()
-    
-    # 2. TRIP TRAJECTORIES
-    print("2. Creating trip trajectories...")
-    plt.figure(figsize=(14, 10))
-    trips = df['TRIP_ID'].unique()
-    colors = plt.cm.tab20(np.linspace(0, 1, min(len(trips), 20)))
-    for i, trip_id in enumerate(trips[:20]):
-        trip_data = df[df['TRIP_ID'] == trip_id]
-        color_idx = i % 20
-        plt.plot(trip_data['X_COORDINA'], trip_data['Y_COORDINA'], 
-                '-o', color=colors[color_idx], alpha=0.6, 
-                markersize=3, linewidth=1, label=f'Trip {trip_id}')
+    return _save_figure(fig, output_folder, 'longitude_vs_latitude', dpi, formats)
+
+
+def plot_trip_trajectories(df, output_folder, dpi=FIGURE_DPI, formats=FIGURE_FORMATS, max_trips=20):
+    # max_trips=None draws every trip as one line collection without markers
+    # or legend; meant for the simplified trajectories, which are in trip order
+    fig = plt.figure(figsize=(14, 10))
+    if max_trips is None:
+        trip = df.groupby(TRIP_KEYS, sort=False, observed=True).ngroup().to_numpy()
+        lines = np.split(df[['X_COORDINA', 'Y_COORDINA']].to_numpy(dtype=float),
+                         np.flatnonzero(trip[1:] != trip[:-1]) + 1)
+        colors = plt.cm.tab20(np.arange(len(lines)) % 20)
+        ax = plt.gca()
+        ax.add_collection(LineCollection(lines, colors=colors, alpha=0.6, linewidths=1))
+        ax.autoscale()
+        plt.title(f'GPS Trajectories - All {len(lines)} Trips (Simplified)', fontsize=14, fontweight='bold')
+    else:
+        trips = df['TRIP_ID'].unique()
+        colors = plt.cm.tab20(np.linspace(0, 1, min(len(trips), max_trips)))
+        for i, trip_id in enumerate(trips[:max_trips]):
+            trip_data = df[df['TRIP_ID'] == trip_id]
+            color_idx = i % 20
+            plt.plot(trip_data['X_COORDINA'], trip_data['Y_COORDINA'], 
+                    '-o', color=colors[color_idx], alpha=0.6, 
+                    markersize=3, linewidth=1, label=f'Trip {trip_id}')
+        plt.title('GPS Trajectories by Trip', fontsize=14, fontweight='bold')
+        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
     plt.xlabel('Longitude', fontsize=12)
     plt.ylabel('Latitude', fontsize=12)
-    plt.title('GPS Trajectories by Trip', fontsize=14, fontweight='bold')
     plt.grid(True, alpha=0.3)
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
-    plt.tight_layout()
-    fig_file = output_folder / 'trips_trajectories.png'
-    plt.savefig(fig_file, dpi=300, bbox_inches='tight')
-    print(f"   ✓ Saved: {fig_file}")
-    plt.close()
-    
-    # 3. HEATMAP (REQUIRED)
-    print("3. Creating GPS density heatmap... (REQUIRED)")
+    return _save_figure(fig, output_folder, 'trips_trajectories', dpi, formats)
+
+
+def plot_density_heatmap(df, output_folder, dpi=FIGURE_DPI, formats=FIGURE_FORMATS, tiles_file=None):
+    # Weighted tile cells stand in for the raw points when a tiles file is given
+    x, y, weights = df['X_COORDINA'], df['Y_COORDINA'], None
+    if tiles_file is not None:
+        x, y, weights, _ = tile_cells(load_density_tiles(tiles_file))
     fig, axes = plt.subplots(1, 2, figsize=(18, 7))
     ax1 = axes[0]
-    hb = ax1.hexbin(df['X_COORDINA'], df['Y_COORDINA'], 
+    hb = ax1.hexbin(x, y, C=weights, reduce_C_function=np.sum,
                     gridsize=50, cmap='YlOrRd', mincnt=1)
     ax1.set_xlabel('Longitude', fontsize=12)
     ax1.set_ylabel('Latitude', fontsize=12)
@@ -92,7 +145,7 @@ def visualize_gps_data(csv_file, output_folder=None):
     ax1.grid(True, alpha=0.3)
     
     ax2 = axes[1]
-    hist, xedges, yedges = np.histogram2d(df['X_COORDINA'], df['Y_COORDINA'], bins=50)
+    hist, xedges, yedges = np.histogram2d(x, y, bins=50, weights=weights)
     extent = [xedges[0], xedges[-1], yedges[0], yedges[-1]]
     im = ax2.imshow(hist.T, extent=extent, origin='lower', cmap='YlOrRd', aspect='auto')
     ax2.set_xlabel('Longitude', fontsize=12)
@@ -100,14 +153,10 @@ def visualize_gps_data(csv_file, output_folder=None):
     ax2.set_title('GPS Point Density Heatmap (2D Histogram)', fontsize=12, fontweight='bold')
     plt.colorbar(im, ax=ax2, label='Number of GPS points')
     ax2.grid(True, alpha=0.3)
-    plt.tight_layout()
-    fig_file = output_folder / 'gps_density_heatmap.png'
-    plt.savefig(fig_file, dpi=300, bbox_inches='tight')
-    print(f"   ✓ Saved: {fig_file}")
-    plt.close()
-    
-    # 4. SPEED ANALYSIS
-    print("4. Creating speed analysis...")
+    return _save_figure(fig, output_folder, 'gps_density_heatmap', dpi, formats)
+
+
+def plot_speed_analysis(df, output_folder, dpi=FIGURE_DPI, formats=FIGURE_FORMATS):
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
     ax1 = axes[0, 0]
     ax1.hist(df['SPEED'], bins=50, color='steelblue', alpha=0.7, edgecolor='black')
@@ -117,6 +166,7 @@ def visualize_gps_data(csv_file, output_folder=None):
     ax1.grid(True, alpha=0.3)
     
     ax2 = axes[0, 1]
+    trips = df['TRIP_ID'].unique()
     trip_speeds = [df[df['TRIP_ID'] == trip]['SPEED'].values for trip in trips[:20]]
     bp = ax2.boxplot(trip_speeds, patch_artist=True)
     for patch in bp['boxes']:
@@ -127,7 +177,7 @@ def visualize_gps_data(csv_file, output_folder=None):
     ax2.grid(True, alpha=0.3, axis='y')
     
     ax3 = axes[1, 0]
-    ax3.scatter(df['DISTANCE_KM'], df['SPEED'], alpha=0.3, s=5)
+    ax3.scatter(df['DISTANCE_KM'], df['SPEED'], alpha=0.3, s=5, linewidths=0, rasterized=True)
     ax3.set_xlabel('Distance (km)', fontsize=11)
     ax3.set_ylabel('Speed (km/h)', fontsize=11)
     ax3.set_title('Speed vs Distance', fontsize=11, fontweight='bold')
@@ -139,21 +189,16 @@ def visualize_gps_data(csv_file, output_folder=None):
     ax4.set_ylabel('Frequency', fontsize=11)
     ax4.set_title('Acceleration Distribution', fontsize=11, fontweight='bold')
     ax4.grid(True, alpha=0.3)
-    plt.tight_layout()
-    fig_file = output_folder / 'speed_analysis.png'
-    plt.savefig(fig_file, dpi=300, bbox_inches='tight')
-    print(f"   ✓ Saved: {fig_file}")
-    plt.close()
-    
-    # 5. TEMPORAL ANALYSIS
-    print("5. Creating temporal analysis...")
-    df['DATETIME'] = pd.to_datetime(df['DATE'] + ' ' + df['TIME'])
-    df['HOUR'] = df['DATETIME'].dt.hour
-    df['DAY_OF_WEEK'] = df['DATETIME'].dt.dayofweek
+    return _save_figure(fig, output_folder, 'speed_analysis', dpi, formats)
+
+
+def plot_temporal_analysis(df, output_folder, dpi=FIGURE_DPI, formats=FIGURE_FORMATS):
+    hours = df['DATETIME'].dt.hour
+    days_of_week = df['DATETIME'].dt.dayofweek
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     
     ax1 = axes[0]
-    hourly_counts = df['HOUR'].value_counts().sort_index()
+    hourly_counts = hours.value_counts().sort_index()
     ax1.bar(hourly_counts.index, hourly_counts.values, color='teal', alpha=0.7)
     ax1.set_xlabel('Hour of Day', fontsize=11)
     ax1.set_ylabel('Number of GPS Points', fontsize=11)
@@ -162,7 +207,7 @@ def visualize_gps_data(csv_file, output_folder=None):
     ax1.grid(True, alpha=0.3, axis='y')
     
     ax2 = axes[1]
-    day_counts = df['DAY_OF_WEEK'].value_counts().sort_index()
+    day_counts = days_of_week.value_counts().sort_index()
     days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
     ax2.bar(range(7), [day_counts.get(i, 0) for i in range(7)], color='purple', alpha=0.7)
     ax2.set_xlabel('Day of Week', fontsize=11)
@@ -171,27 +216,110 @@ def visualize_gps_data(csv_file, output_folder=None):
     ax2.set_xticks(range(7))
     ax2.set_xticklabels(days)
     ax2.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    fig_file = output_folder / 'temporal_analysis.png'
-    plt.savefig(fig_file, dpi=300, bbox_inches='tight')
-    print(f"   ✓ Saved: {fig_file}")
-    plt.close()
+    return _save_figure(fig, output_folder, 'temporal_analysis', dpi, formats)
+
+
+# (plot function, progress message, columns it needs)
+FIGURES = [
+    (plot_longitude_latitude, "Creating longitude vs latitude plot...",
+     ['X_COORDINA', 'Y_COORDINA', 'SPEED']),
+    (plot_trip_trajectories, "Creating trip trajectories...",
+     ['USER_ID', 'TRIP_ID', 'X_COORDINA', 'Y_COORDINA']),
+    (plot_density_heatmap, "Creating GPS density heatmap... (REQUIRED)",
+     ['X_COORDINA', 'Y_COORDINA']),
+    (plot_speed_analysis, "Creating speed analysis...",
+     ['TRIP_ID', 'SPEED', 'DISTANCE_KM', 'ACCELERATION']),
+    (plot_temporal_analysis, "Creating temporal analysis...",
+     ['DATETIME'])
+]
+
+
+def _render_job(plot, df, output_folder, dpi, formats, kwargs):
+    plt.switch_backend('Agg')
+    Path(output_folder).mkdir(exist_ok=True, parents=True)
+    return plot(df, output_folder, dpi=dpi, formats=formats, **kwargs)
+
+
+def render_figures(jobs, workers=FIGURE_WORKERS):
+    # jobs are (plot, df, output_folder, dpi, formats, kwargs) tuples; yields the
+    # saved files of each job in order, rendering in worker processes when
+    # workers > 1
+    if workers is None:
+        workers = os.cpu_count()
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _render_job(*job)
+        return
     
-    # 6. SUMMARY STATISTICS
-    print("6. Generating summary statistics...")
-    summary_stats = {
-        'Total GPS Points': len(df),
-        'Total Trips': df['TRIP_ID'].nunique(),
-        'Total Users': df['USER_ID'].nunique(),
-        'Total Distance (km)': df['DISTANCE_KM'].sum(),
-        'Average Speed (km/h)': df['SPEED'].mean(),
-        'Max Speed (km/h)': df['SPEED'].max(),
-        'Min Speed (km/h)': df['SPEED'].min(),
-        'Average Distance (km)': df['DISTANCE_KM'].mean(),
-        'Date Range': f"{df['DATE'].min()} to {df['DATE'].max()}"
-    }
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        futures = [executor.submit(_render_job, *job) for job in jobs]
+        for future in futures:
+            yield future.result()
+
+
+def render_figure_sets(df, output_folder, by='USER_ID', workers=FIGURE_WORKERS,
+                       dpi=FIGURE_DPI, formats=FIGURE_FORMATS):
+    # One full figure set per user (by='USER_ID') or per day (by='DATE'),
+    # each in its own sub-folder; all figures share one worker pool
+    keys = df['DATETIME'].dt.strftime('%Y-%m-%d') if by == 'DATE' else df[by].astype(str)
+    jobs = []
+    for key, group in df.groupby(keys, sort=True, observed=True):
+        group_folder = Path(output_folder) / f"{by.lower()}_{key}"
+        for plot, _, columns in FIGURES:
+            jobs.append((plot, group[columns], group_folder, dpi, formats, {}))
     
-    summary_file = Path(csv_file).parent / 'summary_statistics.txt'
+    fig_files = []
+    for files in render_figures(jobs, workers):
+        fig_files.extend(files)
+    return fig_files
+
+
+def render_all_figures(df, output_folder, workers=FIGURE_WORKERS, dpi=FIGURE_DPI, formats=FIGURE_FORMATS,
+                       figure_sets=FIGURE_SETS, tiles_file=None, simplified_file=None, report=None):
+    # Every figure in FIGURES (plus the figure sets) for an in-memory point
+    # table; tiles_file and simplified_file replace the heatmap and trajectory inputs
+    output_folder = Path(output_folder)
+    output_folder.mkdir(exist_ok=True, parents=True)
+    
+    jobs = []
+    for plot, _, columns in FIGURES:
+        if plot is plot_density_heatmap and tiles_file is not None:
+            jobs.append((plot, df[columns], output_folder, dpi, formats, {'tiles_file': tiles_file}))
+        elif plot is plot_trip_trajectories and simplified_file is not None:
+            jobs.append((plot, load_simplified_trajectories(simplified_file), output_folder, dpi, formats,
+                         {'max_trips': None}))
+        else:
+            jobs.append((plot, df[columns], output_folder, dpi, formats, {}))
+    
+    # With workers > 1 a figure's time is how long the main process waited for it
+    results = render_figures(jobs, workers)
+    for i in range(len(FIGURES)):
+        with stage(report, FIGURES[i][0].__name__, len(df)):
+            fig_files = next(results)
+        print(f"{i + 1}. {FIGURES[i][1]}")
+        if FIGURES[i][0] is plot_density_heatmap and tiles_file is not None:
+            print(f"   Using density tiles: {tiles_file}")
+        if FIGURES[i][0] is plot_trip_trajectories and simplified_file is not None:
+            print(f"   Using simplified trajectories: {simplified_file}")
+        for fig_file in fig_files:
+            print(f"   ✓ Saved: {fig_file}")
+    
+    for by in figure_sets:
+        with stage(report, 'figure_set', len(df), by=by):
+            fig_files = render_figure_sets(df, output_folder, by, workers, dpi, formats)
+        print(f"   ✓ Saved {len(fig_files)} figures per {by} under: {output_folder}")
+    
+    return output_folder
+
+
+def summary_statistics(df):
+    # Computed through the mergeable aggregates of streaming_statistics, so the
+    # chunked mode gives identical numbers
+    summary_stats, _ = finalize_statistics(statistics_partial(df))
+    return summary_stats
+
+
+def save_summary_statistics(summary_stats, summary_file):
     with open(summary_file, 'w') as f:
         f.write("="*60 + "\n")
         f.write("GPS DATA SUMMARY STATISTICS\n")
@@ -201,9 +329,9 @@ def visualize_gps_data(csv_file, output_folder=None):
                 f.write(f"{key:.<45} {value:.2f}\n")
             else:
                 f.write(f"{key:.<45} {value}\n")
-    print(f"   ✓ Saved: {summary_file}")
-    
-    print()
+
+
+def print_summary_statistics(summary_stats):
     print("="*60)
     print("SUMMARY STATISTICS")
     print("="*60)
@@ -213,6 +341,51 @@ def visualize_gps_data(csv_file, output_folder=None):
         else:
             print(f"{key:.<45} {value}")
     print("="*60)
+
+
+def visualize_gps_data(csv_file, output_folder=None, workers=FIGURE_WORKERS,
+                       dpi=FIGURE_DPI, formats=FIGURE_FORMATS, figure_sets=FIGURE_SETS, report=None):
+    print("Loading GPS data...")
+    try:
+        with stage(report, 'load_gps_data') as record:
+            df = load_gps_data(csv_file)
+            record['points'] = len(df)
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {csv_file}")
+        print("Please run Task 1 first!")
+        return None
+    
+    print(f"✓ Loaded {len(df)} GPS points")
+    print(f"  - Trips: {df['TRIP_ID'].nunique()}")
+    print(f"  - Users: {df['USER_ID'].nunique()}")
+    print()
+    
+    if output_folder is None:
+        output_folder = Path(csv_file).parent / 'figures'
+    
+    # Use the density tiles for the heatmap and the simplified trajectories
+    # (all trips) when they are at least as new as the data
+    data_file = columnar_path(csv_file) if columnar_path(csv_file).exists() else Path(csv_file)
+    tiles_file = tiles_path(csv_file)
+    simplified_file = simplified_path(csv_file)
+    use_tiles = tiles_file.exists() and tiles_file.stat().st_mtime >= data_file.stat().st_mtime
+    use_simplified = simplified_file.exists() and simplified_file.stat().st_mtime >= data_file.stat().st_mtime
+    
+    output_folder = render_all_figures(df, output_folder, workers, dpi, formats, figure_sets,
+                                       tiles_file if use_tiles else None,
+                                       simplified_file if use_simplified else None, report)
+    
+    # 6. SUMMARY STATISTICS
+    print("6. Generating summary statistics...")
+    with stage(report, 'summary_statistics', len(df)):
+        summary_stats = summary_statistics(df)
+    
+    summary_file = Path(csv_file).parent / 'summary_statistics.txt'
+    save_summary_statistics(summary_stats, summary_file)
+    print(f"   ✓ Saved: {summary_file}")
+    
+    print()
+    print_summary_statistics(summary_stats)
     
     return output_folder
 
@@ -228,14 +401,24 @@ def main():
     print(f"  OUTPUT:     {OUTPUT_FOLDER}")
     print()
     
-    if not Path(CSV_FILE).exists():
+    if not Path(CSV_FILE).exists() and not columnar_path(CSV_FILE).exists():
         print(f"ERROR: File not found: {CSV_FILE}")
         print("Please run Task 1 first!")
-        print()
-        input("Press Enter to exit...")
+        if not HEADLESS:
+            print()
+            input("Press Enter to exit...")
         return
     
-    fig_folder = visualize_gps_data(CSV_FILE, OUTPUT_FOLDER)
+    report = start_run('task2') if RUN_REPORT else None
+    fig_folder = visualize_gps_data(CSV_FILE, OUTPUT_FOLDER, report=report)
+    
+    if report is not None and report['stages']:
+        finish_run(report)
+        report_file = Path(CSV_FILE).parent / 'run_report_task2.json'
+        save_run_report(report, report_file)
+        print()
+        print_run_report(report)
+        print(f"✓ Saved run report to: {report_file}")
     
     if fig_folder:
         print()
@@ -257,8 +440,9 @@ def main():
         print("VISUALIZATION FAILED ✗")
         print("="*80)
     
-    print()
-    input("Press Enter to close...")
+    if not HEADLESS:
+        print()
+        input("Press Enter to close...")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,282 @@
+"""
+GPS Data Quality Validation
+Course: AMI23K - Lab 2
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from task1 import METRIC_COLUMNS, TRIP_KEYS, compute_metrics, previous_in_group
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CSV_FILE = r"C:\Users\Mhmou\Desktop\Lab report2 D.collection\data-1\results\gps_processed_data.csv"
+
+# Plausible coordinates as (min_lat, min_lon, max_lat, max_lon)
+VALID_BBOX = (-90, -180, 90, 180)
+# Highest plausible speed (GPS or implied by two fixes), km/h
+MAX_SPEED_KMH = 250
+# Jumps shorter than this are GPS noise, never teleports
+MIN_JUMP_KM = 0.2
+# GPS speed and SPEED_CALC may differ by this much (whichever is larger)
+SPEED_TOLERANCE_KMH = 20
+SPEED_TOLERANCE_RATIO = 0.5
+# Only compare speeds over gaps up to this long
+MISMATCH_MAX_GAP_SEC = 60
+# Highest plausible acceleration, km/h per second (30 is about 8 m/s²)
+MAX_ACCELERATION = 30
+
+# What to do with bad points (see BAD_FLAGS): 'flag' keeps them, 'drop'
+# removes them, 'repair' interpolates bad positions in time and drops
+# points with bad timestamps. Metrics are recomputed after drop/repair.
+BAD_POINTS = 'flag'
+
+# ============================================================================
+
+# QUALITY_FLAGS bits
+OUT_OF_RANGE = 1
+DUPLICATE_TIME = 2
+NON_MONOTONIC_TIME = 4
+TELEPORT = 8
+SPEED_MISMATCH = 16
+IMPOSSIBLE_ACCELERATION = 32
+SPEED_OUT_OF_RANGE = 64
+REPAIRED = 128
+
+FLAG_NAMES = {
+    OUT_OF_RANGE: 'OUT_OF_RANGE',
+    DUPLICATE_TIME: 'DUPLICATE_TIME',
+    NON_MONOTONIC_TIME: 'NON_MONOTONIC_TIME',
+    TELEPORT: 'TELEPORT',
+    SPEED_MISMATCH: 'SPEED_MISMATCH',
+    IMPOSSIBLE_ACCELERATION: 'IMPOSSIBLE_ACCELERATION',
+    SPEED_OUT_OF_RANGE: 'SPEED_OUT_OF_RANGE'
+}
+
+# Flags that make a point bad for 'drop' and 'repair'
+BAD_FLAGS = OUT_OF_RANGE | DUPLICATE_TIME | NON_MONOTONIC_TIME | TELEPORT
+BAD_POSITION = OUT_OF_RANGE | TELEPORT
+
+REPORT_FILE_NAME = 'quality_report_trips.csv'
+FILE_REPORT_FILE_NAME = 'quality_report_files.csv'
+
+
+def _next_in_group(prev):
+    nxt = np.full(len(prev), -1, dtype=np.int64)
+    has_prev = prev >= 0
+    nxt[prev[has_prev]] = np.flatnonzero(has_prev)
+    return nxt
+
+
+def quality_flags(trips, lat, lon, speed, metrics):
+    # QUALITY_FLAGS for every point, from the positions, GPS speed and the
+    # compute_metrics columns; trips holds one key per trip in row order
+    prev = previous_in_group(trips)
+    nxt = _next_in_group(prev)
+    first = prev < 0
+    prev = np.where(first, np.arange(len(prev)), prev)
+    distance, time_diff = metrics['DISTANCE_KM'], metrics['TIME_DIFF_SEC']
+    speed_calc, acceleration = metrics['SPEED_CALC'], metrics['ACCELERATION']
+    flags = np.zeros(len(trips), dtype=np.uint8)
+    
+    min_lat, min_lon, max_lat, max_lon = VALID_BBOX
+    with np.errstate(invalid='ignore'):
+        in_range = (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+    flags[~in_range] |= OUT_OF_RANGE
+    flags[~first & (time_diff == 0)] |= DUPLICATE_TIME
+    flags[~first & (time_diff < 0)] |= NON_MONOTONIC_TIME
+    
+    # An isolated jump away and straight back flags only the point in
+    # between, and a jump to the last point of a trip flags that point, as no
+    # return can follow. Any other jump that is not followed by a return flags
+    # the first point of the trip when that is the odd one out, otherwise nothing.
+    fast_in = ~first & (distance > MIN_JUMP_KM) & ((time_diff <= 0) | (speed_calc > MAX_SPEED_KMH))
+    has_next = nxt >= 0
+    fast_out = np.zeros(len(trips), dtype=bool)
+    fast_out[has_next] = fast_in[nxt[has_next]]
+    teleport = fast_in & (fast_out | ~has_next)
+    after_first = np.zeros(len(trips), dtype=bool)
+    after_first[has_next] = teleport[nxt[has_next]]
+    teleport |= first & fast_out & ~after_first
+    flags[teleport] |= TELEPORT
+    
+    moving = ~first & (time_diff > 0)
+    mean_speed = (speed + speed[prev]) / 2
+    tolerance = np.maximum(SPEED_TOLERANCE_KMH, SPEED_TOLERANCE_RATIO * np.maximum(mean_speed, speed_calc))
+    with np.errstate(invalid='ignore'):
+        mismatch = moving & (time_diff <= MISMATCH_MAX_GAP_SEC) & (np.abs(speed_calc - mean_speed) > tolerance)
+        flags[mismatch] |= SPEED_MISMATCH
+        flags[moving & (np.abs(acceleration) > MAX_ACCELERATION)] |= IMPOSSIBLE_ACCELERATION
+        flags[(speed < 0) | (speed > MAX_SPEED_KMH)] |= SPEED_OUT_OF_RANGE
+    return flags
+
+
+def _nearest_good(trips, good):
+    # Index of the closest good point before and after each point within its
+    # trip (-1 when there is none)
+    codes, _ = pd.factorize(np.asarray(trips))
+    order = np.argsort(codes, kind='stable')
+    n = len(order)
+    sorted_codes, position = codes[order], np.arange(n)
+    before = np.maximum.accumulate(np.where(good[order], position, -1))
+    after = np.minimum.accumulate(np.where(good[order], position, n)[::-1])[::-1]
+    before_ok = (before >= 0) & (sorted_codes[np.maximum(before, 0)] == sorted_codes)
+    after_ok = (after < n) & (sorted_codes[np.minimum(after, n - 1)] == sorted_codes)
+    
+    prev_good = np.full(n, -1, dtype=np.int64)
+    next_good = np.full(n, -1, dtype=np.int64)
+    prev_good[order[before_ok]] = order[before[before_ok]]
+    next_good[order[after_ok]] = order[after[after_ok]]
+    return prev_good, next_good
+
+
+def validate_points(trips, lat, lon, epoch, speed, metrics, bad_points=BAD_POINTS):
+    # Flags the points and applies bad_points. Returns the positions of the
+    # points kept, their columns (lat, lon, metrics and QUALITY_FLAGS) and the
+    # flags as detected on the input together with the action taken per point.
+    flags = quality_flags(trips, lat, lon, speed, metrics)
+    action = np.zeros(len(flags), dtype=np.int8)
+    if bad_points == 'flag' or not (flags & BAD_FLAGS).any():
+        return np.arange(len(flags)), {'Y_COORDINA': lat, 'X_COORDINA': lon, **metrics,
+                                       'QUALITY_FLAGS': flags}, flags, action
+    
+    if bad_points == 'drop':
+        keep = (flags & BAD_FLAGS) == 0
+        repaired = np.zeros(len(flags), dtype=bool)
+    elif bad_points == 'repair':
+        keep = (flags & (BAD_FLAGS & ~BAD_POSITION)) == 0
+        repaired = keep & ((flags & BAD_POSITION) != 0)
+        prev_good, next_good = _nearest_good(trips, keep & ~repaired)
+        fixable = repaired & ((prev_good >= 0) | (next_good >= 0))
+        keep &= ~repaired | fixable
+        repaired = fixable
+        
+        lat, lon = lat.astype(float), lon.astype(float)
+        p = np.where(prev_good >= 0, prev_good, next_good)[repaired]
+        q = np.where(next_good >= 0, next_good, prev_good)[repaired]
+        span = (epoch[q] - epoch[p]).astype(float)
+        weight = np.divide(epoch[repaired] - epoch[p], span, out=np.zeros(len(p)), where=span > 0)
+        lat[repaired] = lat[p] + weight * (lat[q] - lat[p])
+        lon[repaired] = lon[p] + weight * (lon[q] - lon[p])
+    else:
+        raise ValueError(f"unknown bad_points option: {bad_points!r}")
+    
+    action[~keep] = -1
+    action[repaired] = 1
+    positions = np.flatnonzero(keep)
+    trips, lat, lon, epoch, speed = trips[keep], lat[keep], lon[keep], epoch[keep], speed[keep]
+    metrics = compute_metrics(trips, lat, lon, epoch.astype('datetime64[s]'), speed)
+    new_flags = quality_flags(trips, lat, lon, speed, metrics)
+    new_flags[repaired[keep]] |= REPAIRED
+    return positions, {'Y_COORDINA': lat, 'X_COORDINA': lon, **metrics,
+                       'QUALITY_FLAGS': new_flags}, flags, action
+
+
+def quality_report(keys, flags, action):
+    # Per-group counts of every flag and of dropped/repaired points; keys is
+    # a DataFrame of the group columns, one row per input point
+    counts = pd.DataFrame({'NUM_POINTS': np.ones(len(flags), dtype=np.int64)}, index=keys.index)
+    for bit, name in FLAG_NAMES.items():
+        counts[name] = (flags & bit) != 0
+    counts['NUM_FLAGGED'] = flags != 0
+    counts['NUM_DROPPED'] = action < 0
+    counts['NUM_REPAIRED'] = action > 0
+    report = counts.groupby([keys[c] for c in keys.columns], sort=False, observed=True).sum()
+    report['FLAGGED_PCT'] = (100 * report['NUM_FLAGGED'] / report['NUM_POINTS']).round(2)
+    return report.reset_index()
+
+
+def validate_arrays(arrays, file_name, bad_points=BAD_POINTS):
+    # Validation for one file's process_gsd_file arrays; returns the new
+    # arrays (with QUALITY_FLAGS) and the file's per-trip quality report
+    positions, columns, flags, action = validate_points(
+        arrays['TRIP_ID'],
+        arrays['Y_COORDINA'],
+        arrays['X_COORDINA'],
+        arrays['EPOCH'],
+        arrays['SPEED'],
+        {column: arrays[column] for column in METRIC_COLUMNS},
+        bad_points
+    )
+    validated = {key: values[positions] for key, values in arrays.items()}
+    validated.update(columns)
+    
+    keys = pd.DataFrame({'FILE': file_name, 'TRIP_ID': arrays['TRIP_ID']})
+    return validated, quality_report(keys, flags, action)
+
+
+def validate_gps_data(df, bad_points=BAD_POINTS):
+    # Validation for a processed point table (after calculate_metrics or read
+    # back from the CSV/Parquet output); returns the validated table with a
+    # QUALITY_FLAGS column and the per-trip quality report. The CSV lists a
+    # trip's points by POINT_ID as text, so the points are checked in time
+    # order and then put back in the order they came in.
+    time_column = 'DATETIME_OBJ' if 'DATETIME_OBJ' in df.columns else 'DATETIME'
+    df = df.reset_index(drop=True).sort_values(TRIP_KEYS + [time_column], kind='stable')
+    rows = df.index.to_numpy()
+    df = df.reset_index(drop=True)
+    epoch = df[time_column].to_numpy().astype('datetime64[s]').astype(np.int64)
+    trips = df.groupby(TRIP_KEYS, sort=False, observed=True).ngroup().to_numpy()
+    positions, columns, flags, action = validate_points(
+        trips,
+        df['Y_COORDINA'].to_numpy(dtype=float),
+        df['X_COORDINA'].to_numpy(dtype=float),
+        epoch,
+        df['SPEED'].to_numpy(dtype=float),
+        {column: df[column].to_numpy(dtype=float) for column in METRIC_COLUMNS},
+        bad_points
+    )
+    restore = np.argsort(rows[positions], kind='stable')
+    validated = df.iloc[positions[restore]].reset_index(drop=True)
+    for column, values in columns.items():
+        values = values[restore]
+        if column in validated.columns:
+            values = pd.Series(values).astype(validated[column].dtype).to_numpy()
+        validated[column] = values
+    
+    return validated, quality_report(df[TRIP_KEYS], flags, action)
+
+
+def file_quality_report(trip_report, by='FILE'):
+    report = trip_report.drop(columns=['TRIP_ID', 'FLAGGED_PCT']).groupby(by, sort=False, observed=True).sum()
+    report.insert(0, 'NUM_TRIPS', trip_report.groupby(by, sort=False, observed=True).size())
+    report['FLAGGED_PCT'] = (100 * report['NUM_FLAGGED'] / report['NUM_POINTS']).round(2)
+    return report.reset_index()
+
+
+def main():
+    from task2 import load_gps_data
+    
+    print("="*80)
+    print("GPS DATA QUALITY VALIDATION")
+    print("Course: AMI23K - Lab 2")
+    print("="*80)
+    print()
+    print("Configured paths:")
+    print(f"  INPUT CSV:  {CSV_FILE}")
+    print(f"  Bad points: {BAD_POINTS}")
+    print()
+    
+    try:
+        df = load_gps_data(CSV_FILE)
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {CSV_FILE}")
+        print("Please run Task 1 first!")
+        return
+    
+    validated, report = validate_gps_data(df)
+    output_path = Path(CSV_FILE).parent
+    report.to_csv(output_path / REPORT_FILE_NAME, index=False)
+    file_quality_report(report, by='USER_ID').to_csv(output_path / FILE_REPORT_FILE_NAME, index=False)
+    
+    print(f"✓ Validated {len(df)} GPS points from {len(report)} trips")
+    for name in FLAG_NAMES.values():
+        print(f"  {name:.<30} {int(report[name].sum())}")
+    print(f"  Dropped: {int(report['NUM_DROPPED'].sum())}, repaired: {int(report['NUM_REPAIRED'].sum())}")
+    print(f"✓ Saved quality reports to: {output_path / REPORT_FILE_NAME}, {FILE_REPORT_FILE_NAME}")
+
+
+if __name__ == "__main__":
+    main()